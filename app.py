@@ -1,9 +1,7 @@
 import streamlit as st
 import os
+import time
 from datetime import datetime
-from utils.blog_generator import BlogGenerator
-from utils.tech_tracker import TechTracker
-from utils.content_processor import ContentProcessor
 
 # Page configuration
 st.set_page_config(
@@ -12,12 +10,22 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize components
+# Components are imported and created on first use, so the first page renders
+# without loading the API clients and only the ones a request needs are built
 @st.cache_resource
-def init_components():
-    return BlogGenerator(), TechTracker(), ContentProcessor()
+def get_blog_generator():
+    from utils.blog_generator import BlogGenerator
+    return BlogGenerator()
 
-blog_generator, tech_tracker, content_processor = init_components()
+@st.cache_resource
+def get_tech_tracker():
+    from utils.tech_tracker import TechTracker
+    return TechTracker()
+
+@st.cache_resource
+def get_content_processor():
+    from utils.content_processor import ContentProcessor
+    return ContentProcessor()
 
 # Sidebar
 st.sidebar.title("⚙️ Configuration")
@@ -67,69 +75,205 @@ with st.expander("Advanced Options"):
     with col5:
         output_format = st.selectbox(
             "Output Format",
-            ["markdown", "html", "json"]
+            ["markdown", "html", "json", "frontmatter"]
         )
 
 # Word count info
 st.sidebar.markdown("---")
 st.sidebar.markdown("### Estimated Word Count")
-word_counts = {
-    "short": "~800 words",
-    "medium": "~1500 words",
-    "long": "~2500 words",
-    "very_long": "~4000 words"
+TARGET_WORDS = {
+    "short": 800,
+    "medium": 1500,
+    "long": 2500,
+    "very_long": 4000
 }
-st.sidebar.info(f"Target length: {word_counts[article_length]}")
+st.sidebar.info(f"Target length: ~{TARGET_WORDS[article_length]} words")
+
+show_timings = st.sidebar.checkbox("Show timing panel", value=False)
+
+# Generation runs as a background job; the job ID and the finished result live in
+# session state, so reruns (including the download button) never regenerate
+def run_generation(report, params):
+    """Generate, post-process and format one piece of content, reporting progress."""
+    if params["content_type"] == "Trend Report":
+        report(stage="Fetching trend sources")
+        content = get_tech_tracker().generate_trend_report(params["topic"])
+    else:
+        blog_generator = get_blog_generator()
+        if params["content_type"] == "Tutorial":
+            events = blog_generator.stream_tutorial(params["topic"], params["difficulty"])
+        else:
+            events = blog_generator.stream_blog_post(params["topic"], params["style"], params["length"])
+
+        report(stage="Searching recent content")
+        streamed_title, streamed_body = "", ""
+        content = None
+        for event in events:
+            if event["type"] == "title":
+                streamed_title += event["text"]
+            elif event["type"] == "content":
+                streamed_body += event["text"]
+            elif event["type"] == "done":
+                content = event["content"]
+            words = len(streamed_body.split())
+            report(
+                stage="Writing",
+                progress=min(0.95, words / params["target_words"]),
+                preview=f"# {streamed_title}\n\n{streamed_body}"
+            )
+
+    return finish_content(report, content, params)
+
+def run_regeneration(report, params, content, sections, regenerate_title):
+    """Regenerate selected sections (and optionally the title) of a very long article."""
+    report(stage="Regenerating " + ", ".join(sections + (["title"] if regenerate_title else [])))
+    content = get_blog_generator().regenerate_sections(content, sections, regenerate_title)
+    return finish_content(report, content, params)
+
+def finish_content(report, content, params):
+    """Apply the code option, add metadata and format the content."""
+    if not params["include_code"] and content.get("content") is not None:
+        from utils.code_extractor import strip_code_blocks
+        content["content"] = strip_code_blocks(content["content"])
+        content["code_examples"] = []
+
+    # Add metadata and process content
+    report(stage="Formatting")
+    content_processor = get_content_processor()
+    content = content_processor.add_metadata(content)
+    from utils.tracing import start_trace
+    with start_trace("formatting") as formatting:
+        formatted_content = content_processor.process_content(content, params["output_format"])
+
+    # Formatting happens after generation; show it in the timing panel with the generation stages
+    trace = content["metadata"].get("trace")
+    if trace is not None:
+        trace["spans"].extend(formatting.to_dict()["spans"])
+
+    # Prometheus textfile export
+    if os.getenv("METRICS_FILE"):
+        from utils.tracing import METRICS
+        METRICS.write_prometheus(os.getenv("METRICS_FILE"))
+
+    return {
+        "content": content,
+        "formatted": formatted_content,
+        "output_format": params["output_format"],
+        "topic": params["topic"],
+        "params": params,
+        "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S")
+    }
+
+@st.cache_resource
+def get_job_runner():
+    from utils.job_runner import JobRunner
+    return JobRunner(workers=int(os.getenv("JOB_WORKERS", 2)))
 
-# Generation
 if st.button("Generate Content", type="primary"):
     if not topic:
         st.error("Please enter a topic")
     else:
-        with st.spinner(f"Generating {article_length} article about {topic}..."):
-            try:
-                # Generate content based on type
-                if content_type == "Blog Post":
-                    content = blog_generator.generate_blog_post(topic, style, article_length)
-                elif content_type == "Tutorial":
-                    content = blog_generator.generate_tutorial(topic, difficulty)
-                elif content_type == "Trend Report":
-                    content = tech_tracker.generate_trend_report(topic)
-                else:
-                    content = blog_generator.generate_blog_post(topic, style, article_length)
-
-                # Add metadata
-                content = content_processor.add_metadata(content)
-
-                # Process content
-                formatted_content = content_processor.process_content(content, output_format)
-
-                # Display results
-                st.success("Content generated successfully!")
-                
-                # Display word count
-                word_count = len(formatted_content.split())
-                st.info(f"Generated article length: {word_count} words")
-                
-                # Preview section
-                st.subheader("Preview")
-                if output_format == "html":
-                    st.markdown(formatted_content, unsafe_allow_html=True)
-                else:
-                    st.markdown(formatted_content)
-
-                # Download button
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{topic.lower().replace(' ', '_')}_{timestamp}.{output_format}"
-                st.download_button(
-                    label="Download Content",
-                    data=formatted_content,
-                    file_name=filename,
-                    mime="text/plain"
+        params = {
+            "content_type": content_type,
+            "topic": topic,
+            "style": style,
+            "length": article_length,
+            "difficulty": difficulty,
+            "include_code": include_code,
+            "output_format": output_format,
+            # Tutorials are always generated at medium length
+            "target_words": TARGET_WORDS["medium" if content_type == "Tutorial" else article_length]
+        }
+        st.session_state["job_id"] = get_job_runner().submit(
+            lambda report: run_generation(report, params), kind=content_type, params=params
+        )
+        st.session_state.pop("result", None)
+
+# Poll the running job, showing its streamed preview until it finishes
+if "job_id" in st.session_state:
+    job = get_job_runner().get(st.session_state["job_id"])
+    if job is None or job["status"] in ("failed", "interrupted"):
+        del st.session_state["job_id"]
+        error = job["error"] if job else "Job not found"
+        st.error(f"Error generating content: {error}")
+    elif job["status"] == "done":
+        del st.session_state["job_id"]
+        st.session_state["result"] = job["result"]
+    else:
+        params = job["params"]
+        label = job["stage"] or f"Generating {params['length']} article about {params['topic']}..."
+        st.progress(job["progress"], text=label)
+        if job["preview"]:
+            st.markdown(job["preview"])
+        time.sleep(0.5)
+        st.rerun()
+
+# Display the finished result
+if "result" in st.session_state:
+    result = st.session_state["result"]
+    content = result["content"]
+    formatted_content = result["formatted"]
+
+    # Display results
+    st.success("Content generated successfully!")
+
+    # Display word count
+    word_count = len(formatted_content.split())
+    st.info(f"Generated article length: {word_count} words")
+
+    # Preview section
+    st.subheader("Preview")
+    if result["output_format"] == "html":
+        st.markdown(formatted_content, unsafe_allow_html=True)
+    else:
+        st.markdown(formatted_content)
+
+    # Timing panel
+    trace = content.get("metadata", {}).get("trace")
+    if show_timings and trace:
+        with st.expander("Timing", expanded=True):
+            st.caption(
+                f"Total {trace['total_seconds']}s · "
+                f"{trace['prompt_tokens']} prompt / {trace['completion_tokens']} completion tokens"
+            )
+            st.table([
+                {
+                    "stage": record["stage"],
+                    "detail": record.get("section") or record.get("source") or record.get("format") or "",
+                    "model": record.get("model", ""),
+                    "seconds": record["seconds"],
+                    "prompt tokens": record.get("prompt_tokens", ""),
+                    "completion tokens": record.get("completion_tokens", ""),
+                    "cache hit": record.get("cache_hit", "")
+                }
+                for record in trace["spans"]
+            ])
+            if trace["cache"]:
+                st.json(trace["cache"])
+
+    # Very long articles can have single sections or the title rewritten
+    if content.get("sections"):
+        with st.expander("Regenerate sections"):
+            selected = st.multiselect("Sections", [section["name"] for section in content["sections"]])
+            regenerate_title = st.checkbox("Regenerate title")
+            if st.button("Regenerate", disabled=not (selected or regenerate_title)):
+                params = result["params"]
+                st.session_state["job_id"] = get_job_runner().submit(
+                    lambda report: run_regeneration(report, params, content, selected, regenerate_title),
+                    kind="regenerate_sections", params=params
                 )
+                st.session_state.pop("result", None)
+                st.rerun()
 
-            except Exception as e:
-                st.error(f"Error generating content: {str(e)}")
+    # Download button
+    extension = {"markdown": "md", "frontmatter": "md"}.get(result["output_format"], result["output_format"])
+    filename = f"{result['topic'].lower().replace(' ', '_')}_{result['timestamp']}.{extension}"
+    st.download_button(
+        label="Download Content",
+        data=formatted_content,
+        file_name=filename,
+        mime="text/plain"
+    )
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,101 @@
+"""
+Cold-start benchmark: import time, component construction and first render of the app.
+
+Every measurement runs in a fresh interpreter so nothing is already imported, which
+is what a new container or scale-out replica sees. For each case it also reports the
+heavy client libraries that ended up loaded, to catch imports that stop being lazy.
+
+    python -m benchmarks.bench_cold_start --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+# Third-party client libraries the app should only load when a request needs them
+HEAVY_MODULES = ["openai", "exa_py", "markdown", "frontmatter", "github", "requests", "bs4"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "import utils.blog_generator": "import utils.blog_generator",
+    "import utils.tech_tracker": "import utils.tech_tracker",
+    "import utils.content_processor": "import utils.content_processor",
+    "construct BlogGenerator": "from utils.blog_generator import BlogGenerator; BlogGenerator()",
+    "construct TechTracker": "from utils.tech_tracker import TechTracker; TechTracker()",
+    "construct ContentProcessor": "from utils.content_processor import ContentProcessor; ContentProcessor()",
+    "app first render": (
+        "from streamlit.testing.v1 import AppTest; "
+        "AppTest.from_file('app.py', default_timeout=60).run()"
+    )
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_case(statement: str, env: Dict) -> Dict:
+    """Time one statement in a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit status {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    errors = [sample["error"] for sample in samples if "error" in sample]
+    if errors:
+        return {"error": errors[0]}
+    seconds = [sample["seconds"] for sample in samples]
+    return {
+        "median": round(statistics.median(seconds), 4),
+        "min": round(min(seconds), 4),
+        "max": round(max(seconds), 4),
+        "loaded": samples[-1]["loaded"]
+    }
+
+
+def main(argv=None) -> Dict:
+    parser = argparse.ArgumentParser(description="Measure import time and first render in fresh interpreters.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per case")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # Placeholder keys let the generator be constructed; nothing is sent to the APIs
+        env = dict(os.environ)
+        env.setdefault("EXA_API_KEY", "benchmark")
+        env.setdefault("OPENAI_API_KEY", "benchmark")
+        env["CACHE_PATH"] = os.path.join(scratch, "cache.sqlite")
+
+        report = {case: summarize([run_case(CASES[case], env) for _ in range(args.repeat)]) for case in args.cases}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'case':32} {'median':>8} {'min':>8} {'max':>8}  heavy modules loaded")
+        for case, stats in report.items():
+            if "error" in stats:
+                print(f"{case:32} failed: {stats['error']}")
+            else:
+                print(f"{case:32} {stats['median']:>8.4f} {stats['min']:>8.4f} {stats['max']:>8.4f}  "
+                      f"{', '.join(stats['loaded']) or '-'}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Latency-simulating stand-ins for the Exa, OpenAI, GitHub and HTTP clients.
+
+The fakes implement just enough of each client's interface for BlogGenerator and
+TechTracker. Latencies are drawn from configurable distributions and every sleep
+is multiplied by time_scale, so a run can simulate real API timings in a fraction
+of the wall-clock time.
+"""
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+WORDS = (
+    "container image build layer cache registry deploy cluster service network volume runtime "
+    "performance latency throughput memory scheduler kernel compiler module package release "
+    "feature api interface pattern pipeline workflow testing monitoring security config"
+).split()
+
+
+class FakeAPIError(Exception):
+    """Error carrying an HTTP status, like the SDKs' API errors."""
+
+    def __init__(self, status_code: int, message: str = "Simulated API error", retry_after: Optional[float] = None):
+        super().__init__(f"{message} (status {status_code})")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class LatencyModel:
+    """
+    Latency distribution in seconds.
+
+    kind is "fixed" (always median), "uniform" (median +/- spread) or "lognormal"
+    (median with shape sigma, giving a realistic long tail).
+    """
+
+    def __init__(self, median: float, kind: str = "lognormal", sigma: float = 0.4, spread: float = 0.0):
+        self.median = median
+        self.kind = kind
+        self.sigma = sigma
+        self.spread = spread
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.median
+        if self.kind == "uniform":
+            return max(0.0, rng.uniform(self.median - self.spread, self.median + self.spread))
+        return rng.lognormvariate(math.log(self.median), self.sigma)
+
+
+class _Backend:
+    """Shared latency, error and bookkeeping logic for the fakes."""
+
+    def __init__(self, latency: LatencyModel, error_rate: float = 0.0, error_status: int = 429,
+                 time_scale: float = 1.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.time_scale = time_scale
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self, error_rate: Optional[float] = None) -> tuple:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency.sample(self._rng)
+            failed = self._rng.random() < (self.error_rate if error_rate is None else error_rate)
+            if failed:
+                self.errors += 1
+            return delay, failed, self._rng.random()
+
+    def _sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def _text(self, words: int, seed: float) -> str:
+        rng = random.Random(seed)
+        return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+class FakeExa(_Backend):
+    """Stand-in for exa_py.Exa returning generated search results."""
+
+    def __init__(self, latency: Optional[LatencyModel] = None, results: int = 10, words_per_result: int = 800, **kwargs):
+        super().__init__(latency or LatencyModel(1.2), **kwargs)
+        self.results = results
+        self.words_per_result = words_per_result
+
+    def search_and_contents(self, query: str, **kwargs):
+        delay, failed, seed = self._draw()
+        self._sleep(delay)
+        if failed:
+            raise FakeAPIError(self.error_status)
+        return SimpleNamespace(results=[
+            SimpleNamespace(
+                id=f"{seed}-{i}",
+                url=f"https://example.com/{abs(hash(query))}/{i}",
+                title=f"{query} article {i}",
+                text="\n\n".join(
+                    self._text(100, seed + i + paragraph) for paragraph in range(self.words_per_result // 100)
+                ),
+                published_date=datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                author="Fake Author",
+                score=1.0 / (i + 1)
+            )
+            for i in range(self.results)
+        ])
+
+
+class FakeChatCompletions(_Backend):
+    """
+    Stand-in for client.chat.completions with time-to-first-token and token throughput.
+
+    degraded maps a model name to {"slowdown": factor, "error_rate": rate} to simulate
+    one backend slowing down or failing while the others stay healthy.
+    """
+
+    def __init__(self, latency: Optional[LatencyModel] = None, tokens_per_second: Optional[Dict] = None,
+                 completion_ratio: float = 0.8, degraded: Optional[Dict] = None, **kwargs):
+        super().__init__(latency or LatencyModel(0.5), **kwargs)
+        self.tokens_per_second = tokens_per_second or {"gpt-3.5-turbo": 90.0, "gpt-4": 25.0}
+        self.completion_ratio = completion_ratio
+        self.degraded = degraded or {}
+        self.calls_by_model = {}
+
+    def _draw_for(self, model: str) -> tuple:
+        """Draw latency and failure for a model, applying its degradation."""
+        degradation = self.degraded.get(model, {})
+        delay, failed, seed = self._draw(degradation.get("error_rate"))
+        with self._lock:
+            self.calls_by_model[model] = self.calls_by_model.get(model, 0) + 1
+        return delay * degradation.get("slowdown", 1.0), failed, seed
+
+    def _throughput(self, model: str) -> float:
+        matches = [name for name in self.tokens_per_second if model.startswith(name)]
+        return self.tokens_per_second[max(matches, key=len)] if matches else 50.0
+
+    def _completion_text(self, messages: List[Dict], tokens: int, seed: float) -> str:
+        system = messages[0]["content"] if messages else ""
+        if "title" in system.lower():
+            return "Simulated Title"
+        if "search query" in system.lower():
+            return "simulated search query"
+        words = max(1, int(tokens * 0.75))
+        body = self._text(words, seed)
+        code = "```python\nprint('simulated')\n```"
+        return f"# Simulated Article\n\n## Overview\n\n{body}\n\n{code}"
+
+    def _prepare(self, model: str, messages: List[Dict], max_tokens: int, seed: float) -> tuple:
+        """Return the completion text, its response object and the simulated generation time."""
+        completion_tokens = max(1, int(max_tokens * self.completion_ratio))
+        text = self._completion_text(messages, completion_tokens, seed)
+        slowdown = self.degraded.get(model, {}).get("slowdown", 1.0)
+        prompt_tokens = sum(len(message["content"]) // 4 for message in messages)
+        response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens
+            )
+        )
+        return text, response, completion_tokens / self._throughput(model) * slowdown
+
+    def create(self, model: str, messages: List[Dict], max_tokens: int = 256, stream: bool = False, **kwargs):
+        delay, failed, seed = self._draw_for(model)
+        self._sleep(delay)
+        if failed:
+            raise FakeAPIError(self.error_status, retry_after=0.0)
+
+        text, response, generation_time = self._prepare(model, messages, max_tokens, seed)
+        if stream:
+            return self._stream(text, generation_time)
+
+        self._sleep(generation_time)
+        return response
+
+    def _stream(self, text: str, generation_time: float):
+        pieces = [text[i:i + 16] for i in range(0, len(text), 16)]
+        for piece in pieces:
+            self._sleep(generation_time / len(pieces))
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+class FakeOpenAI:
+    """Stand-in for an OpenAI client: exposes chat.completions.create()."""
+
+    def __init__(self, **kwargs):
+        self.completions = FakeChatCompletions(**kwargs)
+        self.chat = SimpleNamespace(completions=self.completions)
+
+
+class FakeAsyncChatCompletions(FakeChatCompletions):
+    """Async stand-in for client.chat.completions; waits on the event loop instead of blocking a thread."""
+
+    async def create(self, model: str, messages: List[Dict], max_tokens: int = 256, **kwargs):
+        delay, failed, seed = self._draw_for(model)
+        await asyncio.sleep(delay * self.time_scale)
+        if failed:
+            raise FakeAPIError(self.error_status, retry_after=0.0)
+
+        _, response, generation_time = self._prepare(model, messages, max_tokens, seed)
+        await asyncio.sleep(generation_time * self.time_scale)
+        return response
+
+
+class FakeAsyncOpenAI:
+    """Stand-in for an AsyncOpenAI client: exposes an awaitable chat.completions.create()."""
+
+    def __init__(self, **kwargs):
+        self.completions = FakeAsyncChatCompletions(**kwargs)
+        self.chat = SimpleNamespace(completions=self.completions)
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeResponse:
+    """Minimal requests.Response stand-in."""
+
+    def __init__(self, payload, status_code: int = 200):
+        self.status_code = status_code
+        self.content = payload.encode("utf-8") if isinstance(payload, str) else json.dumps(payload).encode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise FakeAPIError(self.status_code)
+
+
+class FakeSession(_Backend):
+    """Stand-in for requests.Session serving Hacker News, dev.to and arXiv responses."""
+
+    def __init__(self, latency: Optional[LatencyModel] = None, items: int = 10, **kwargs):
+        super().__init__(latency or LatencyModel(0.4), **kwargs)
+        self.items = items
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout: Optional[float] = None) -> FakeResponse:
+        delay, failed, seed = self._draw()
+        self._sleep(delay)
+        if failed:
+            return FakeResponse({}, status_code=self.error_status)
+
+        now = datetime.now(timezone.utc)
+        if "arxiv" in url:
+            entries = "".join(
+                f"<entry><id>http://arxiv.org/abs/{i}</id><title>{self._text(8, seed + i)}</title>"
+                f"<published>{now.isoformat()}</published><summary>{self._text(60, seed + i)}</summary>"
+                f"<author><name>Author {i}</name></author></entry>"
+                for i in range(self.items)
+            )
+            return FakeResponse(f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>')
+        if "articles" in url:
+            return FakeResponse([
+                {"title": self._text(8, seed + i), "url": f"https://dev.to/{i}", "user": {"name": "Author"},
+                 "published_at": now.isoformat(), "public_reactions_count": i}
+                for i in range(self.items)
+            ])
+        return FakeResponse({"hits": [
+            {"title": self._text(8, seed + i), "url": f"https://example.com/hn/{i}", "points": i,
+             "num_comments": i, "objectID": str(i), "created_at": now.isoformat(),
+             "created_at_i": int(now.timestamp())}
+            for i in range(self.items)
+        ]})
+
+
+class FakeGithub(_Backend):
+    """Stand-in for github.Github.search_repositories."""
+
+    def __init__(self, latency: Optional[LatencyModel] = None, items: int = 10, **kwargs):
+        super().__init__(latency or LatencyModel(0.6), **kwargs)
+        self.items = items
+
+    def search_repositories(self, query: str, sort: Optional[str] = None, order: Optional[str] = None) -> List:
+        delay, failed, seed = self._draw()
+        self._sleep(delay)
+        if failed:
+            raise FakeAPIError(self.error_status)
+        return [
+            SimpleNamespace(
+                full_name=f"example/repo-{i}", html_url=f"https://github.com/example/repo-{i}",
+                description=self._text(12, seed + i), stargazers_count=1000 - i, forks_count=100 - i,
+                language="Python", pushed_at=datetime.now(timezone.utc)
+            )
+            for i in range(self.items)
+        ]
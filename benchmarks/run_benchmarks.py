@@ -0,0 +1,243 @@
+"""
+Offline end-to-end benchmark for the generation pipeline.
+
+Runs BlogGenerator and TechTracker against the latency-simulating fakes and reports
+p50/p95/p99 latency and throughput per content type and length, plus the cost of
+rendering with ContentProcessor. No API keys or network access are needed.
+
+    python -m benchmarks.run_benchmarks --iterations 20 --time-scale 0.05
+
+With --async, article cases run through AsyncBlogGenerator on one event loop instead
+of a thread per concurrent run. --degrade-model slows down (and with
+--degrade-error-rate, fails) one model to exercise the model router's fallback:
+
+    python -m benchmarks.run_benchmarks --lengths long --degrade-model gpt-4 --degrade-slowdown 4 --latency-slo 60
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.fakes import FakeAsyncOpenAI, FakeExa, FakeGithub, FakeOpenAI, FakeSession, LatencyModel
+from utils.async_blog_generator import AsyncBlogGenerator
+from utils.blog_generator import BlogGenerator
+from utils.cache import DiskCache
+from utils.content_processor import ContentProcessor
+from utils.model_router import ModelRouter
+from utils.rate_limiter import RateLimiter
+from utils.result_cache import ResultCache
+from utils.tech_tracker import TechTracker
+from utils.trend_index import TrendIndex
+
+CONTENT_TYPES = ["Blog Post", "Tutorial", "Technical Guide", "Trend Report"]
+LENGTHS = ["short", "medium", "long", "very_long"]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples: List[float], wall: float, errors: int) -> Dict:
+    return {
+        "runs": len(samples),
+        "errors": errors,
+        "p50": round(percentile(samples, 50), 4),
+        "p95": round(percentile(samples, 95), 4),
+        "p99": round(percentile(samples, 99), 4),
+        "throughput_per_s": round(len(samples) / wall, 3) if wall > 0 else 0.0
+    }
+
+
+def build_components(args) -> tuple:
+    """Build a generator and tracker wired to the fakes, with caches disabled."""
+    backend = {"error_rate": args.error_rate, "time_scale": args.time_scale, "seed": args.seed}
+    completions = {
+        "latency": LatencyModel(args.openai_latency, sigma=args.sigma),
+        "tokens_per_second": {"gpt-3.5-turbo": args.gpt35_tps, "gpt-4": args.gpt4_tps},
+        "degraded": {
+            args.degrade_model: {"slowdown": args.degrade_slowdown, "error_rate": args.degrade_error_rate}
+        } if args.degrade_model else {}
+    }
+    rate_limiter = RateLimiter(limits={}, base_delay=0.01 * args.time_scale)
+    # Router timings are in real seconds, so scale them like the simulated delays
+    model_router = ModelRouter(
+        rate_limiter,
+        latency_slo=args.latency_slo * args.time_scale if args.latency_slo else None,
+        cooldown=30.0 * args.time_scale,
+        stale_after=300.0 * args.time_scale,
+        enabled=not args.no_routing
+    )
+    generator_class, clients = BlogGenerator, {}
+    if args.use_async:
+        generator_class, clients = AsyncBlogGenerator, {"async_openai_client": FakeAsyncOpenAI(**completions, **backend)}
+    generator = generator_class(
+        exa_client=FakeExa(latency=LatencyModel(args.exa_latency, sigma=args.sigma), **backend),
+        openai_client=FakeOpenAI(**completions, **backend),
+        search_cache=DiskCache("exa_search", path=":memory:", enabled=False),
+        query_cache=DiskCache("search_query", path=":memory:", enabled=False),
+        rate_limiter=rate_limiter,
+        model_router=model_router,
+        result_cache=ResultCache("articles", path=":memory:", enabled=False),
+        section_cache=DiskCache("sections", path=":memory:", enabled=False),
+        **clients
+    )
+    tracker = TechTracker(
+        session=FakeSession(latency=LatencyModel(args.http_latency, sigma=args.sigma), **backend),
+        github_client=FakeGithub(latency=LatencyModel(args.http_latency, sigma=args.sigma), **backend),
+        result_cache=ResultCache("trend_reports", path=":memory:", enabled=False),
+        trend_index=TrendIndex(path=":memory:"),
+        trend_refresh_interval=0
+    )
+    return generator, tracker
+
+
+def job_for(generator: BlogGenerator, tracker: TechTracker, content_type: str, length: str) -> Callable[[], Dict]:
+    """Mirror the app's dispatch on content type."""
+    if content_type == "Tutorial":
+        return lambda: generator.generate_tutorial("Docker")
+    if content_type == "Trend Report":
+        return lambda: tracker.generate_trend_report("Docker")
+    style = "Technical" if content_type == "Blog Post" else "Deep Dive"
+    return lambda: generator.generate_blog_post("Docker", style, length)
+
+
+def async_job_for(generator: AsyncBlogGenerator, content_type: str, length: str) -> Callable[[], Awaitable[Dict]]:
+    """Async counterpart of job_for for the article content types."""
+    if content_type == "Tutorial":
+        return lambda: generator.agenerate_tutorial("Docker")
+    style = "Technical" if content_type == "Blog Post" else "Deep Dive"
+    return lambda: generator.agenerate_blog_post("Docker", style, length)
+
+
+def run_case_async(job: Callable[[], Awaitable[Dict]], iterations: int, concurrency: int) -> tuple:
+    """Like run_case, with at most `concurrency` runs in flight on one event loop."""
+    latencies, errors, results = [], [0], []
+
+    async def runs():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def once():
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    results.append(await job())
+                    latencies.append(time.perf_counter() - start)
+                except Exception:
+                    errors[0] += 1
+
+        await asyncio.gather(*(once() for _ in range(iterations)))
+
+    wall_start = time.perf_counter()
+    asyncio.run(runs())
+    return latencies, time.perf_counter() - wall_start, errors[0], results[-1] if results else None
+
+
+def run_case(job: Callable[[], Dict], iterations: int, concurrency: int) -> tuple:
+    """Run a job repeatedly; returns (latencies, wall time, error count, last result)."""
+    latencies, errors, results = [], [0], []
+
+    def once():
+        start = time.perf_counter()
+        try:
+            results.append(job())
+            latencies.append(time.perf_counter() - start)
+        except Exception:
+            errors[0] += 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(iterations):
+            executor.submit(once)
+    return latencies, time.perf_counter() - wall_start, errors[0], results[-1] if results else None
+
+
+def bench_rendering(processor: ContentProcessor, content: Dict, iterations: int) -> Dict:
+    """Time ContentProcessor.process_content for every output format."""
+    report = {}
+    for output_format in processor.supported_formats:
+        samples = []
+        wall_start = time.perf_counter()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            processor.process_content(dict(content), output_format)
+            samples.append(time.perf_counter() - start)
+        report[output_format] = summarize(samples, time.perf_counter() - wall_start, 0)
+    return report
+
+
+def main(argv=None) -> Dict:
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark with simulated Exa/OpenAI backends.")
+    parser.add_argument("--iterations", type=int, default=20, help="Runs per content type and length")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent runs")
+    parser.add_argument("--content-types", nargs="+", default=CONTENT_TYPES, choices=CONTENT_TYPES)
+    parser.add_argument("--lengths", nargs="+", default=LENGTHS, choices=LENGTHS)
+    parser.add_argument("--time-scale", type=float, default=0.05, help="Multiplier applied to every simulated delay")
+    parser.add_argument("--exa-latency", type=float, default=1.2, help="Median Exa search latency (s)")
+    parser.add_argument("--openai-latency", type=float, default=0.5, help="Median OpenAI time to first token (s)")
+    parser.add_argument("--http-latency", type=float, default=0.4, help="Median trend source latency (s)")
+    parser.add_argument("--sigma", type=float, default=0.4, help="Lognormal shape of every latency distribution")
+    parser.add_argument("--gpt35-tps", type=float, default=90.0, help="gpt-3.5-turbo tokens per second")
+    parser.add_argument("--gpt4-tps", type=float, default=25.0, help="gpt-4 tokens per second")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability each fake call fails with a 429")
+    parser.add_argument("--render-iterations", type=int, default=200, help="Iterations of the rendering benchmark")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run article cases through AsyncBlogGenerator on one event loop")
+    parser.add_argument("--degrade-model", choices=["gpt-3.5-turbo", "gpt-4"], help="Model whose backend is degraded")
+    parser.add_argument("--degrade-slowdown", type=float, default=4.0, help="Latency multiplier of the degraded model")
+    parser.add_argument("--degrade-error-rate", type=float, default=0.0, help="Failure probability of the degraded model")
+    parser.add_argument("--latency-slo", type=float, help="Model router latency SLO per completion (simulated s)")
+    parser.add_argument("--no-routing", action="store_true", help="Always use the preferred models")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    generator, tracker = build_components(args)
+    processor = ContentProcessor()
+    report = {"time_scale": args.time_scale, "pipeline": {}, "rendering": {}}
+    sample_content = None
+
+    for content_type in args.content_types:
+        # Tutorials and trend reports ignore the length option
+        lengths = args.lengths if content_type in ("Blog Post", "Technical Guide") else ["-"]
+        for length in lengths:
+            if args.use_async and content_type != "Trend Report":
+                job = async_job_for(generator, content_type, length)
+                latencies, wall, errors, result = run_case_async(job, args.iterations, args.concurrency)
+            else:
+                job = job_for(generator, tracker, content_type, length)
+                latencies, wall, errors, result = run_case(job, args.iterations, args.concurrency)
+            report["pipeline"][f"{content_type} / {length}"] = summarize(latencies, wall, errors)
+            if result is not None and content_type != "Trend Report":
+                sample_content = result
+
+    completions = generator.async_openai if args.use_async else generator.openai_client
+    report["models"] = {"calls": completions.completions.calls_by_model, **generator.model_router.snapshot()}
+
+    if sample_content is not None:
+        report["rendering"] = bench_rendering(processor, processor.add_metadata(sample_content), args.render_iterations)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Simulated latencies scaled by {args.time_scale} (real seconds = reported / time scale)\n")
+        print(f"{'case':32} {'runs':>5} {'err':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'runs/s':>8}")
+        for section in ("pipeline", "rendering"):
+            for case, stats in report[section].items():
+                label = case if section == "pipeline" else f"render {case}"
+                print(f"{label:32} {stats['runs']:>5} {stats['errors']:>4} {stats['p50']:>9.4f} "
+                      f"{stats['p95']:>9.4f} {stats['p99']:>9.4f} {stats['throughput_per_s']:>8.2f}")
+        print(f"\nCompletions per model: {report['models']['calls']}")
+        for route in report["models"]["routed"]:
+            print(f"Routed {route['from']} -> {route['to']} ({route['reason']}): {route['count']}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from utils.async_blog_generator import AsyncBlogGenerator
+from utils.cache import DiskCache
+from utils.model_router import ModelRouter
+from utils.rate_limiter import RateLimiter
+from utils.result_cache import ResultCache
+
+
+class AsyncCompletions:
+    """Fake async chat.completions that answers after a delay."""
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.calls = 0
+
+    async def create(self, **request):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        message = SimpleNamespace(content="# Docker Today\nContainers everywhere.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class LoopWatchingCache(DiskCache):
+    """DiskCache that records whether it was used from the event loop's thread."""
+
+    def __init__(self, *args, loop_thread, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loop_thread = loop_thread
+        self.on_loop = 0
+
+    def get(self, key):
+        self.on_loop += threading.current_thread() is self.loop_thread
+        return super().get(key)
+
+    def set(self, key, value):
+        self.on_loop += threading.current_thread() is self.loop_thread
+        return super().set(key, value)
+
+
+def make_generator(completions, query_mode="template"):
+    limiter = RateLimiter(limits={}, max_retries=0)
+    loop_thread = threading.current_thread()
+    return AsyncBlogGenerator(
+        async_openai_client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        openai_client=SimpleNamespace(),
+        exa_client=SimpleNamespace(search_and_contents=lambda *args, **kwargs: SimpleNamespace(results=[])),
+        query_mode=query_mode,
+        rate_limiter=limiter,
+        model_router=ModelRouter(limiter, enabled=False),
+        search_cache=LoopWatchingCache("exa_search", path=":memory:", loop_thread=loop_thread),
+        query_cache=LoopWatchingCache("search_query", path=":memory:", loop_thread=loop_thread),
+        result_cache=ResultCache("articles", path=":memory:"),
+        section_cache=LoopWatchingCache("sections", path=":memory:", loop_thread=loop_thread)
+    )
+
+
+def test_cancelled_caller_still_caches_the_generation():
+    completions = AsyncCompletions()
+    generator = make_generator(completions)
+
+    async def scenario():
+        caller = asyncio.ensure_future(generator.agenerate_blog_post("Docker", "Technical", "short"))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        for _ in range(100):
+            if not generator._in_flight:
+                break
+            await asyncio.sleep(0.01)
+        assert generator._in_flight == {}
+        return await generator.agenerate_blog_post("Docker", "Technical", "short")
+
+    result = asyncio.run(scenario())
+
+    assert completions.calls == 1
+    assert result["title"] == "Docker Today"
+    assert result["metadata"]["result_cache"] == "hit"
+
+
+def test_concurrent_callers_share_one_generation():
+    completions = AsyncCompletions()
+    generator = make_generator(completions)
+
+    async def scenario():
+        return await asyncio.gather(*[generator.agenerate_blog_post("Docker", "Technical", "short") for _ in range(3)])
+
+    results = asyncio.run(scenario())
+
+    assert completions.calls == 1
+    assert sorted(result["metadata"]["result_cache"] for result in results) == ["miss", "shared", "shared"]
+    assert generator._in_flight == {}
+
+
+def test_caches_are_not_used_on_the_event_loop():
+    completions = AsyncCompletions(delay=0.0)
+    generator = make_generator(completions, query_mode="llm")
+
+    async def scenario():
+        result = await generator.agenerate_blog_post("Docker", "Technical", "very_long")
+        await generator.aclose()
+        return result
+
+    result = asyncio.run(scenario())
+
+    for cache in (generator.search_cache, generator.query_cache, generator.section_cache):
+        assert cache.on_loop == 0
+    assert generator.section_cache.get(DiskCache.make_key("context", result["context_hash"])) is not None
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from utils.batch_generator import BatchGenerator
+from utils.content_processor import ContentProcessor
+
+
+class APIError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class FlakyGenerator:
+    """Blog generator stand-in that raises the given errors before succeeding."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def generate_blog_post(self, topic, style, length):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"title": topic, "content": "Body", "date": "2026-10-17"}
+
+
+class HangingGenerator:
+    """Blog generator stand-in whose "Hang" jobs block until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def generate_blog_post(self, topic, style, length):
+        if topic.startswith("Hang"):
+            self.release.wait(10)
+        return {"title": topic, "content": "Body", "date": "2026-10-17"}
+
+
+def run(generator, jobs, tmp_path, **kwargs):
+    batch = BatchGenerator(generator, ContentProcessor(), **kwargs)
+    return batch.run(jobs, str(tmp_path))
+
+
+def test_failed_jobs_are_not_run_again(tmp_path):
+    # Transient errors reaching the batch were already retried by the rate limiter
+    generator = FlakyGenerator([APIError(429)])
+
+    summary = run(generator, [{"topic": "Docker"}], tmp_path)
+
+    assert summary["failed"] == 1
+    assert summary["failures"][0]["error"] == "status 429"
+    assert generator.calls == 1
+
+
+def test_trend_report_without_tracker_fails(tmp_path):
+    summary = run(FlakyGenerator([]), [{"topic": "Docker", "content_type": "Trend Report"}], tmp_path)
+
+    assert summary["failures"] == [
+        {"index": 0, "topic": "Docker", "error": "Trend Report jobs require a TechTracker"}
+    ]
+
+
+def test_abandoned_workers_do_not_stall_later_jobs(tmp_path):
+    generator = HangingGenerator()
+    jobs = [{"topic": f"Hang {i}"} for i in range(3)] + [{"topic": "Docker"}, {"topic": "Rust"}]
+
+    try:
+        start = time.monotonic()
+        summary = run(generator, jobs, tmp_path, workers=1, timeout=0.2)
+        elapsed = time.monotonic() - start
+    finally:
+        generator.release.set()
+
+    assert summary["failed"] == 3 and summary["succeeded"] == 2
+    assert elapsed < 3
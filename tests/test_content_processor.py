@@ -0,0 +1,97 @@
+import copy
+
+from utils.content_processor import ContentProcessor
+from utils.tracing import start_trace
+
+
+def article():
+    return {
+        "title": "Docker Networking",
+        "date": "2026-10-17",
+        "content": "## Bridges\n\nText.",
+        "tags": ["Docker"],
+        "metadata": {"generator": "Technical Blog Generator", "trace": {"spans": [], "cache": {}}}
+    }
+
+
+def test_process_content_does_not_modify_the_content():
+    processor = ContentProcessor()
+    content = article()
+    original = copy.deepcopy(content)
+
+    first = processor.process_content(content, "json")
+    second = processor.process_content(content, "json")
+
+    assert content == original
+    assert first == second
+
+
+def test_process_content_records_its_span_on_the_current_trace():
+    with start_trace("formatting") as trace:
+        ContentProcessor().process_content(article(), "html")
+
+    assert [(record["stage"], record["format"]) for record in trace.to_dict()["spans"]] == [
+        ("process_content", "html")
+    ]
+
+
+def test_only_requested_formats_are_hashed(monkeypatch):
+    processor = ContentProcessor()
+    hashed = []
+    original = ContentProcessor._content_hash
+
+    def counting_hash(value):
+        hashed.append(value)
+        return original(value)
+
+    monkeypatch.setattr(ContentProcessor, "_content_hash", staticmethod(counting_hash))
+
+    processor.render(article(), ["markdown", "html"])
+
+    # One hash of the document fields, shared by both formats; the full dict is never hashed
+    assert len(hashed) == 1
+    assert "metadata" not in hashed[0]
+
+
+def test_rendered_outputs_are_memoized():
+    processor = ContentProcessor()
+    content = article()
+
+    first = processor.render(content, ["html", "json"])
+    content["metadata"]["trace"]["spans"].append({"stage": "search"})
+    second = processor.render(content, ["html", "json"])
+
+    assert second["html"] is first["html"]
+    assert second["json"] != first["json"]
+
+
+def trend_report(points=120):
+    return {
+        "type": "trend_report",
+        "technology": "Rust",
+        "date": "2026-10-17",
+        "sources": {"trends": {"status": "ok", "items": 1}, "research": {"status": "timeout", "items": 0}},
+        "trends": [{"title": "Rust 2.0 released", "url": "https://example.com/hn", "points": points, "comments": 45}],
+        "github_activity": [{"name": "rust-lang/rust", "url": "https://github.com/rust-lang/rust", "stars": 90000}],
+        "blog_posts": [],
+        "research": []
+    }
+
+
+def test_trend_reports_are_rendered_with_a_title_and_their_items():
+    rendered = ContentProcessor().render(ContentProcessor().add_metadata(trend_report()))
+
+    assert rendered["markdown"].startswith("# Rust Trend Report\n")
+    assert "- [Rust 2.0 released](https://example.com/hn) (120 points, 45 comments)" in rendered["markdown"]
+    assert "rust-lang/rust" in rendered["html"] and "Unavailable sources: research" in rendered["html"]
+    assert "title: Rust Trend Report" in rendered["frontmatter"] and "type: trend_report" in rendered["frontmatter"]
+    assert '"technology": "Rust"' in rendered["json"]
+
+
+def test_trend_report_changes_are_not_served_from_the_memo():
+    processor = ContentProcessor()
+
+    first = processor.process_content(trend_report(points=120), "markdown")
+    second = processor.process_content(trend_report(points=300), "markdown")
+
+    assert "120 points" in first and "300 points" in second
@@ -0,0 +1,69 @@
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from utils.job_runner import JobRunner, JobStore
+
+
+def job_record(job_id, owner, updated_at=None, status="running"):
+    now = time.time()
+    return {
+        "id": job_id, "kind": "generation", "params": {}, "status": status, "progress": 0.0, "stage": None,
+        "preview": None, "result": None, "error": None, "owner": owner, "created_at": now,
+        "updated_at": updated_at or now
+    }
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_job_lifecycle(tmp_path):
+    runner = JobRunner(JobStore(str(tmp_path / "jobs.sqlite")), flush_interval=0)
+
+    done = runner.submit(lambda report: report(stage="Writing", progress=0.5) or {"words": 3})
+    failed = runner.submit(lambda report: 1 / 0)
+    runner.shutdown()
+
+    assert runner.get(done)["status"] == "done"
+    assert runner.get(done)["result"] == {"words": 3}
+    assert runner.get(done)["owner"] == runner.owner
+    assert runner.get(failed)["status"] == "failed"
+    assert runner.get(failed)["error"] == "division by zero"
+
+
+def test_starting_runner_keeps_jobs_of_live_processes(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    release = threading.Event()
+    first = JobRunner(JobStore(path), flush_interval=0)
+    job_id = first.submit(lambda report: release.wait(5) and {"ok": True})
+    time.sleep(0.05)
+
+    # A second replica sharing the store must not interrupt the first one's job
+    second = JobRunner(JobStore(path), flush_interval=0)
+    assert second.get(job_id)["status"] == "running"
+
+    release.set()
+    first.shutdown()
+    assert second.get(job_id)["status"] == "done"
+
+
+def test_jobs_of_stopped_processes_are_interrupted(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    host = socket.gethostname()
+    store.save(job_record("dead", f"{host}:{dead_pid()}:abcd1234"))
+    store.save(job_record("legacy", None))
+    store.save(job_record("remote", "other-host:1:abcd1234"))
+    store.save(job_record("remote-stale", "other-host:1:abcd1234", updated_at=time.time() - 7200))
+
+    JobRunner(store)
+
+    assert store.get("dead")["status"] == "interrupted"
+    assert store.get("legacy")["status"] == "interrupted"
+    assert store.get("remote")["status"] == "running"
+    assert store.get("remote-stale")["status"] == "interrupted"
+
@@ -0,0 +1,83 @@
+from tests.test_result_cache import StreamingCompletions
+from tests.test_result_cache import make_generator as make_streaming_generator
+from tests.test_section_generation import SleepyCompletions, make_generator
+from utils.blog_generator import SECTIONS
+from utils.cache import DiskCache
+from utils.model_router import ModelRouter
+from utils.rate_limiter import RateLimiter
+
+
+class RecordingCompletions(SleepyCompletions):
+    """SleepyCompletions that remembers the model of every request."""
+
+    def __init__(self):
+        super().__init__(delay=0.0)
+        self.models = []
+
+    def create(self, **request):
+        self.models.append(request["model"])
+        return super().create(**request)
+
+
+def degrade_gpt4(generator):
+    """Give the generator a router that sends gpt-4 requests to its fallback after repeated failures."""
+    generator.model_router = ModelRouter(RateLimiter(limits={}, max_retries=0))
+    for _ in range(5):
+        generator.model_router.record("gpt-4", failed=True)
+    return generator
+
+
+def make_degraded_generator(completions):
+    return degrade_gpt4(make_generator(completions))
+
+
+def routed_count(generator):
+    return sum(generator.model_router.routed.values())
+
+
+def test_request_is_routed_once_and_budgeted_for_the_model_it_uses():
+    completions = RecordingCompletions()
+    generator = make_degraded_generator(completions)
+    budgeted = []
+    budget = generator._context_token_budget
+    generator._context_token_budget = lambda length, config: budgeted.append(config["model"]) or budget(length, config)
+
+    generator._generate_content("Docker", [], "Technical", "very_long")
+
+    assert routed_count(generator) == 1
+    assert budgeted == ["gpt-3.5-turbo"]
+    assert completions.models == ["gpt-3.5-turbo"] * (len(SECTIONS) + 1)
+
+
+def test_streamed_request_is_routed_once():
+    generator = degrade_gpt4(make_streaming_generator(StreamingCompletions(delay=0.0)))
+
+    events = list(generator.stream_blog_post("Docker", "Technical", "long"))
+
+    assert events[-1]["type"] == "done"
+    assert routed_count(generator) == 1
+
+
+def test_fallback_sections_are_not_served_to_the_preferred_model():
+    shared_cache = DiskCache("sections", path=":memory:")
+    degraded = make_degraded_generator(RecordingCompletions())
+    degraded.section_cache = shared_cache
+    degraded._generate_sections("Docker", "context", "Technical", "very_long")
+
+    completions = RecordingCompletions()
+    healthy = make_generator(completions)
+    healthy.section_cache = shared_cache
+    healthy._generate_sections("Docker", "context", "Technical", "very_long")
+
+    assert completions.models == ["gpt-4"] * (len(SECTIONS) + 1)
+
+
+def test_section_keys_ignore_why_a_request_was_routed():
+    generator = make_generator(SleepyCompletions(delay=0.0))
+    config = {"model": "gpt-3.5-turbo", "max_tokens": 4096}
+    routed = dict(config, routed_from="gpt-4", route_reason="failures")
+
+    assert generator._section_key("Docker", "Technical", SECTIONS[0], "context", routed, 800) == \
+        generator._section_key("Docker", "Technical", SECTIONS[0], "context", config, 800)
+    assert generator._section_key("Docker", "Technical", SECTIONS[0], "context", dict(config, max_tokens=2000), 800) \
+        != generator._section_key("Docker", "Technical", SECTIONS[0], "context", config, 800)
@@ -0,0 +1,28 @@
+import utils.rate_limiter as rate_limiter
+from utils.rate_limiter import RateLimiter
+
+
+def test_unconfigured_keys_are_not_throttled(monkeypatch):
+    monkeypatch.delenv("RATE_LIMITS", raising=False)
+    monkeypatch.setattr(rate_limiter, "_shared_limiter", None)
+    limiter = rate_limiter.get_rate_limiter()
+
+    # A very_long article: five sections and a title reserved at once
+    waits = [limiter.reserve("gpt-4", 4800) for _ in range(6)]
+
+    assert waits == [0.0] * 6
+    assert limiter.utilization("gpt-4") == 0.0
+
+
+def test_configured_limits_apply_to_prefixed_models(monkeypatch):
+    monkeypatch.setenv("RATE_LIMITS", '{"gpt-4": {"rpm": 60, "tpm": 10000}}')
+    monkeypatch.setattr(rate_limiter, "_shared_limiter", None)
+    limiter = rate_limiter.get_rate_limiter()
+
+    assert limiter.reserve("gpt-4-0613", 10000) == 0.0
+    assert limiter.reserve("gpt-4", 4800) > 0
+    assert limiter.reserve("gpt-3.5-turbo", 100000) == 0.0
+
+
+def test_limits_default_to_unlimited():
+    assert RateLimiter().limits == {}
@@ -0,0 +1,106 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from utils.blog_generator import BlogGenerator
+from utils.cache import DiskCache
+from utils.model_router import ModelRouter
+from utils.rate_limiter import RateLimiter
+from utils.result_cache import ResultCache
+
+
+class StreamingCompletions:
+    """Fake chat.completions that streams a short article after a delay."""
+
+    def __init__(self, delay: float = 0.3):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, stream=False, **request):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        pieces = ["# Docker Today\n", "Containers ", "everywhere."]
+        if not stream:
+            message = SimpleNamespace(content="".join(pieces))
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+        return iter(SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))]) for piece in pieces)
+
+
+def make_generator(completions):
+    limiter = RateLimiter(limits={}, max_retries=0)
+    return BlogGenerator(
+        exa_client=SimpleNamespace(search_and_contents=lambda *args, **kwargs: SimpleNamespace(results=[])),
+        openai_client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        query_mode="template",
+        rate_limiter=limiter,
+        model_router=ModelRouter(limiter, enabled=False),
+        search_cache=DiskCache("exa_search", path=":memory:", enabled=False),
+        query_cache=DiskCache("search_query", path=":memory:", enabled=False),
+        result_cache=ResultCache("articles", path=":memory:"),
+        section_cache=DiskCache("sections", path=":memory:", enabled=False)
+    )
+
+
+def stream(generator, topic="Docker"):
+    events = list(generator.stream_blog_post(topic, "Technical", "short"))
+    return events, events[-1]["content"]
+
+
+def test_concurrent_identical_streams_share_one_generation():
+    completions = StreamingCompletions()
+    generator = make_generator(completions)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(lambda _: stream(generator), range(3)))
+
+    assert completions.calls == 1
+    for events, content in results:
+        assert events[0] == {"type": "title", "text": "Docker Today"}
+        assert content["title"] == "Docker Today"
+    assert sorted(content.get("metadata", {}).get("result_cache", "miss") for _, content in results) == [
+        "miss", "shared", "shared"
+    ]
+
+
+def test_streams_and_blocking_calls_share_one_generation():
+    completions = StreamingCompletions()
+    generator = make_generator(completions)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        streamed = executor.submit(stream, generator)
+        time.sleep(0.05)
+        blocking = executor.submit(generator.generate_blog_post, "Docker", "Technical", "short")
+        _, streamed_content = streamed.result()
+        blocking_content = blocking.result()
+
+    assert completions.calls == 1
+    assert blocking_content["metadata"]["result_cache"] == "shared"
+    assert blocking_content["title"] == streamed_content["title"]
+
+
+def test_shared_results_are_copies():
+    generator = make_generator(StreamingCompletions())
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first, second = executor.map(lambda _: stream(generator)[1], range(2))
+
+    first["content"] = "modified"
+    assert second["content"] == "Containers everywhere."
+
+
+def test_abandoned_stream_fails_waiting_requests():
+    generator = make_generator(StreamingCompletions())
+    leader = generator.stream_blog_post("Docker", "Technical", "short")
+    next(leader)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        follower = executor.submit(stream, generator)
+        time.sleep(0.05)
+        leader.close()
+        with pytest.raises(RuntimeError, match="abandoned"):
+            follower.result()
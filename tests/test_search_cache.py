@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+
+from tests.test_result_cache import StreamingCompletions, make_generator
+from utils.cache import DiskCache
+
+
+def test_cached_results_without_text_can_be_used():
+    searches = []
+
+    def search_and_contents(query, **kwargs):
+        searches.append(query)
+        result = SimpleNamespace(id="1", url="https://example.com/rust", title="Rust 2.0", text=None)
+        return SimpleNamespace(results=[result])
+
+    generator = make_generator(StreamingCompletions(delay=0.0))
+    generator._exa = SimpleNamespace(search_and_contents=search_and_contents)
+    generator.search_cache = DiskCache("exa_search", path=":memory:")
+
+    fresh = generator.track_tech_trends("Rust")
+    cached = generator.track_tech_trends("Rust")
+
+    assert len(searches) == 1
+    assert fresh == cached == [{"title": "Rust 2.0", "url": "https://example.com/rust", "summary": ""}]
+    assert generator.generate_code_examples("Rust", "rust") == []
@@ -0,0 +1,132 @@
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.blog_generator import SECTIONS, BlogGenerator
+from utils.cache import DiskCache
+from utils.model_router import ModelRouter
+from utils.rate_limiter import RateLimiter
+from utils.result_cache import ResultCache
+
+DELAY = 0.2
+
+
+class SleepyCompletions:
+    """Fake chat.completions that sleeps per call and tracks how many calls overlap."""
+
+    def __init__(self, delay: float = DELAY, fail_section=None):
+        self.delay = delay
+        self.fail_section = fail_section
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def create(self, **request):
+        prompt = request["messages"][-1]["content"]
+        match = re.search(r"create the (.+?) section", prompt)
+        text = f"Body of {match.group(1)}" if match else "A Title"
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+        finally:
+            with self._lock:
+                self.active -= 1
+        if match and match.group(1) == self.fail_section:
+            raise ValueError("model exploded")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))], usage=None)
+
+
+def make_generator(completions, max_section_workers=None):
+    limiter = RateLimiter(limits={}, max_retries=0)
+    return BlogGenerator(
+        max_section_workers=max_section_workers,
+        exa_client=SimpleNamespace(),
+        openai_client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        rate_limiter=limiter,
+        model_router=ModelRouter(limiter, enabled=False),
+        search_cache=DiskCache("exa_search", path=":memory:", enabled=False),
+        query_cache=DiskCache("search_query", path=":memory:", enabled=False),
+        result_cache=ResultCache("articles", path=":memory:", enabled=False),
+        section_cache=DiskCache("sections", path=":memory:", enabled=False)
+    )
+
+
+def test_sections_run_concurrently_and_faster_than_serial():
+    completions = SleepyCompletions()
+    generator = make_generator(completions)
+
+    start = time.perf_counter()
+    title, parts = generator._generate_sections("Docker", "context", "Technical", "very_long")
+    elapsed = time.perf_counter() - start
+
+    serial = (len(SECTIONS) + 1) * DELAY
+    assert completions.calls == len(SECTIONS) + 1
+    assert elapsed < serial / 2
+    assert completions.max_active == len(SECTIONS) + 1
+    assert title == "A Title"
+
+
+def test_sections_are_assembled_in_order():
+    generator = make_generator(SleepyCompletions(delay=0.01))
+
+    title, parts = generator._generate_sections("Docker", "context", "Technical", "very_long")
+
+    assert list(parts) == SECTIONS
+    content = generator._join_sections(title, parts)
+    assert content.startswith("# A Title\n\n")
+    positions = [content.index(f"Body of {section}") for section in SECTIONS]
+    assert positions == sorted(positions)
+
+
+@pytest.mark.parametrize("max_section_workers", [1, 2, 3])
+def test_concurrency_is_capped(max_section_workers):
+    completions = SleepyCompletions(delay=0.05)
+    generator = make_generator(completions, max_section_workers=max_section_workers)
+
+    generator._generate_sections("Docker", "context", "Technical", "very_long")
+
+    assert completions.calls == len(SECTIONS) + 1
+    assert completions.max_active == max_section_workers
+
+
+def test_failing_section_raises_runtime_error_naming_it():
+    failing = SECTIONS[2]
+    generator = make_generator(SleepyCompletions(delay=0.01, fail_section=failing))
+
+    with pytest.raises(RuntimeError, match=f"Failed to generate {failing}: model exploded"):
+        generator._generate_sections("Docker", "context", "Technical", "very_long")
+
+
+def test_title_is_cached_per_context():
+    completions = SleepyCompletions(delay=0.0)
+    generator = make_generator(completions)
+    generator.section_cache = DiskCache("sections", path=":memory:")
+
+    generator._generate_sections("Docker", "context", "Technical", "very_long")
+    generator._generate_sections("Docker", "context", "Technical", "very_long")
+    assert completions.calls == len(SECTIONS) + 1
+
+    generator._generate_sections("Docker", "newer context", "Technical", "very_long")
+    assert completions.calls == 2 * (len(SECTIONS) + 1)
+
+
+def test_sections_can_be_regenerated_without_a_section_cache():
+    completions = SleepyCompletions(delay=0.0)
+    generator = make_generator(completions)
+    title, parts = generator._generate_sections("Docker", "context", "Technical", "very_long")
+    content = generator._assemble_content(
+        "Docker", generator._join_sections(title, parts), "Technical", "very_long", parts, "context"
+    )
+
+    updated = generator.regenerate_sections(content, [SECTIONS[1]])
+
+    assert completions.calls == len(SECTIONS) + 2
+    assert [section["name"] for section in updated["sections"]] == SECTIONS
+    assert updated["context"] == "context"
@@ -0,0 +1,108 @@
+import copy
+import json
+import os
+
+from utils.content_processor import ContentProcessor
+from utils.site_exporter import SiteExporter
+
+
+def article(topic, title="Getting Started", style="Technical", date="2026-10-17"):
+    return ContentProcessor().add_metadata({
+        "title": title,
+        "content": f"All about {topic}.",
+        "date": date,
+        "tags": [topic, style],
+        "topic": topic,
+        "style": style,
+        "length": "medium",
+        "code_examples": []
+    })
+
+
+def trend_report(technology, date="2026-10-17"):
+    return ContentProcessor().add_metadata({
+        "type": "trend_report",
+        "technology": technology,
+        "date": date,
+        "sources": {"trends": {"status": "ok", "items": 1}, "research": {"status": "timeout", "items": 0}},
+        "trends": [{"title": f"{technology} 2.0 released", "url": "https://example.com/hn", "points": 120,
+                    "comments": 45}],
+        "github_activity": [],
+        "blog_posts": [],
+        "research": [],
+        "activity": [],
+        "partial": True
+    })
+
+
+def read(site_dir, path):
+    with open(os.path.join(site_dir, path), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_trend_reports_get_their_own_titled_pages(tmp_path):
+    exporter = SiteExporter(ContentProcessor(), str(tmp_path))
+
+    slugs = {exporter.add(trend_report(technology)) for technology in ("Rust", "Go", "Kubernetes")}
+    stats = exporter.finish()
+
+    assert len(slugs) == 3
+    assert stats["written"] == 3 and stats["articles"] == 3
+    page = read(tmp_path, f"posts/{exporter.add(trend_report('Rust'))}.html")
+    assert "<title>Rust Trend Report</title>" in page
+    assert "Rust 2.0 released" in page and "120 points, 45 comments" in page
+    assert "Unavailable sources: research" in page
+
+
+def test_trend_report_changes_are_exported(tmp_path):
+    exporter = SiteExporter(ContentProcessor(), str(tmp_path))
+    report = trend_report("Rust")
+    slug = exporter.add(report)
+
+    updated = copy.deepcopy(report)
+    updated["trends"][0]["points"] = 300
+    assert exporter.add(updated) == slug
+    exporter.finish()
+
+    assert exporter.stats == {"written": 2, "unchanged": 0, "removed": 0}
+    assert "300 points" in read(tmp_path, f"posts/{slug}.html")
+
+
+def test_same_title_and_date_do_not_collide(tmp_path):
+    exporter = SiteExporter(ContentProcessor(), str(tmp_path))
+
+    docker = exporter.add(article("Docker"))
+    podman = exporter.add(article("Podman"))
+    tutorial = exporter.add(article("Docker", style="Tutorial"))
+    exporter.finish()
+
+    assert len({docker, podman, tutorial}) == 3
+    assert "All about Podman." in read(tmp_path, f"posts/{podman}.md")
+    assert "All about Docker." in read(tmp_path, f"posts/{docker}.md")
+
+
+def test_unchanged_articles_are_skipped_across_exports(tmp_path):
+    first = SiteExporter(ContentProcessor(), str(tmp_path))
+    first.export([article("Docker"), trend_report("Rust")])
+
+    # The trace is not part of the page
+    traced = article("Docker")
+    traced["metadata"]["trace"] = {"spans": [{"name": "search", "seconds": 1.0}]}
+    second = SiteExporter(ContentProcessor(), str(tmp_path))
+    stats = second.export([traced, trend_report("Rust")])
+
+    assert stats["written"] == 0 and stats["unchanged"] == 2
+    manifest = json.loads(read(tmp_path, "manifest.json"))
+    assert sorted(entry["type"] for entry in manifest["articles"].values()) == ["blog_post", "trend_report"]
+
+
+def test_regenerated_article_replaces_its_page(tmp_path):
+    exporter = SiteExporter(ContentProcessor(), str(tmp_path))
+
+    first = exporter.add(article("Docker", title="Docker Basics"))
+    second = exporter.add(article("Docker", title="Docker in Depth"))
+    stats = exporter.finish()
+
+    assert first == second
+    assert stats["articles"] == 1
+    assert "Docker in Depth" in read(tmp_path, "index.md")
@@ -0,0 +1,245 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from utils.result_cache import ResultCache
+from utils.tech_tracker import TechTracker
+from utils.trend_index import TrendIndex
+
+NOW = int(time.time())
+
+PAGINATION_LIMIT = 1000
+
+HN_HITS = [
+    {"objectID": str(i), "title": f"Docker story {i}", "url": f"https://example.com/{i}",
+     "points": 10 * i, "num_comments": i, "created_at_i": NOW - 3600 * i,
+     "created_at": "2026-10-01T00:00:00Z"}
+    for i in range(1, 4)
+]
+
+DEV_TO_ARTICLES = [
+    {"title": "Docker tips", "url": "https://dev.to/a/docker-tips", "user": {"name": "Ada"},
+     "published_at": "2026-10-10T00:00:00Z", "public_reactions_count": 42}
+]
+
+ARXIV_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>http://arxiv.org/abs/2610.00001v1</id>
+    <published>2026-10-01T00:00:00Z</published>
+    <title>Container
+      Scheduling at Scale</title>
+    <summary>We study   container scheduling.</summary>
+    <author><name>Grace Hopper</name></author>
+    <author><name>Alan Turing</name></author>
+  </entry>
+</feed>
+"""
+
+GITHUB_SEARCH = {
+    "total_count": 1,
+    "incomplete_results": False,
+    "items": [{
+        "id": 1, "full_name": "docker/compose", "html_url": "https://github.com/docker/compose",
+        "description": "Define and run multi-container applications", "stargazers_count": 30000,
+        "forks_count": 5000, "language": "Go", "pushed_at": "2026-10-15T12:00:00Z"
+    }]
+}
+
+
+class StandInServer:
+    """Local HTTP server answering like Hacker News, dev.to, arXiv and GitHub."""
+
+    def __init__(self):
+        self.requests = []
+        self.hn_hits = [dict(hit) for hit in HN_HITS]
+        self.delays = {}
+        self.failures = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                source = url.path.strip("/").split("/")[0]
+                server.requests.append((url.path, parse_qs(url.query)))
+                time.sleep(server.delays.get(source, 0))
+                if source in server.failures:
+                    return self._send(500, "text/plain", b"upstream failure")
+                body, content_type = server.respond(url.path, parse_qs(url.query))
+                self._send(200, content_type, body)
+
+            def _send(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def respond(self, path, query):
+        if path.startswith("/hn/"):
+            hits = self.hn_hits
+            for condition in query["numericFilters"][0].split(","):
+                field, operator, value = re.match(r"(\w+)([<>]=)(\d+)", condition).groups()
+                if operator == ">=":
+                    hits = [hit for hit in hits if hit[field] >= int(value)]
+                else:
+                    hits = [hit for hit in hits if hit[field] <= int(value)]
+            if path.endswith("search_by_date"):
+                hits = sorted(hits, key=lambda hit: hit["created_at_i"], reverse=True)
+            size = int(query["hitsPerPage"][0])
+            page = int(query.get("page", ["0"])[0])
+            # Like Algolia, stop paginating after PAGINATION_LIMIT hits
+            pages = min(-(-len(hits) // size), PAGINATION_LIMIT // size)
+            page_hits = hits[page * size:(page + 1) * size] if page < pages else []
+            body = {"hits": page_hits, "page": page, "nbPages": pages}
+            return json.dumps(body).encode(), "application/json"
+        if path.startswith("/devto/"):
+            return json.dumps(DEV_TO_ARTICLES).encode(), "application/json"
+        if path.startswith("/arxiv"):
+            return ARXIV_FEED.encode(), "application/atom+xml"
+        return json.dumps(GITHUB_SEARCH).encode(), "application/json"
+
+    def endpoints(self):
+        return {
+            "hacker_news": f"{self.base}/hn",
+            "dev_to": f"{self.base}/devto",
+            "arxiv": f"{self.base}/arxiv",
+            "github": f"{self.base}/github"
+        }
+
+
+@pytest.fixture
+def server():
+    stand_in = StandInServer()
+    yield stand_in
+    stand_in.httpd.shutdown()
+    stand_in.httpd.server_close()
+
+
+def make_tracker(server, **kwargs):
+    return TechTracker(
+        endpoints=server.endpoints(),
+        result_cache=ResultCache("trend_reports", path=":memory:", enabled=False),
+        trend_index=TrendIndex(path=":memory:"),
+        trend_refresh_interval=0,
+        **kwargs
+    )
+
+
+def test_sources_are_parsed(server):
+    report = make_tracker(server).generate_trend_report("Docker")
+
+    assert report["partial"] is False
+    assert {name: source["status"] for name, source in report["sources"].items()} == {
+        "trends": "ok", "github_activity": "ok", "blog_posts": "ok", "research": "ok"
+    }
+    assert [story["title"] for story in report["trends"]] == ["Docker story 3", "Docker story 2", "Docker story 1"]
+    assert report["trends"][0]["points"] == 30
+    assert report["github_activity"] == [{
+        "name": "docker/compose", "url": "https://github.com/docker/compose",
+        "description": "Define and run multi-container applications", "stars": 30000, "forks": 5000,
+        "language": "Go", "updated_at": "2026-10-15T12:00:00+00:00"
+    }]
+    assert report["blog_posts"][0]["author"] == "Ada"
+    assert report["blog_posts"][0]["reactions"] == 42
+    assert report["research"] == [{
+        "title": "Container Scheduling at Scale", "url": "http://arxiv.org/abs/2610.00001v1",
+        "authors": ["Grace Hopper", "Alan Turing"], "published_at": "2026-10-01T00:00:00Z",
+        "summary": "We study container scheduling."
+    }]
+
+
+def test_dev_to_tag_is_normalized(server):
+    make_tracker(server).fetch_tech_blogs("Node.js")
+
+    path, query = server.requests[-1]
+    assert path == "/devto/articles"
+    assert query["tag"] == ["nodejs"]
+
+
+def test_slow_source_times_out_without_stalling_the_report(server):
+    server.delays["devto"] = 2.0
+    tracker = make_tracker(server, source_timeout=0.5)
+
+    start = time.perf_counter()
+    report = tracker.generate_trend_report("Docker")
+
+    assert time.perf_counter() - start < 1.5
+    assert report["sources"]["blog_posts"] == {"status": "timeout", "items": 0}
+    assert report["blog_posts"] == []
+    assert report["sources"]["research"]["status"] == "ok"
+    assert report["partial"] is True
+
+
+def test_failing_source_is_reported(server):
+    server.failures.add("arxiv")
+
+    report = make_tracker(server).generate_trend_report("Docker")
+
+    assert report["sources"]["research"]["status"] == "error"
+    assert "500" in report["sources"]["research"]["error"]
+    assert report["research"] == []
+    assert report["sources"]["trends"]["status"] == "ok"
+    assert report["partial"] is True
+
+
+def story(i, created_at_i, points=1):
+    return {"objectID": f"s{i}", "title": f"Story {i}", "url": f"https://example.com/s{i}", "points": points,
+            "num_comments": 0, "created_at_i": created_at_i, "created_at": "2026-10-01T00:00:00Z"}
+
+
+def test_refresh_pages_through_every_story_since_the_watermark(server):
+    tracker = make_tracker(server)
+    tracker.get_recent_trends("Docker")
+    watermark = tracker.trend_index.state("Docker", "hacker_news")["watermark"]
+
+    # More new stories than Algolia paginates through in one query
+    server.hn_hits += [story(i, watermark + 1 + i // 3) for i in range(1250)]
+    tracker.get_recent_trends("Docker")
+
+    activity = tracker.get_trend_activity("Docker")
+    assert sum(day["items"] for day in activity) == len(HN_HITS) + 1250
+    assert tracker.trend_index.state("Docker", "hacker_news")["watermark"] == watermark + 1 + 1249 // 3
+    by_date = [query for path, query in server.requests if path == "/hn/search_by_date"]
+    assert len(by_date) > 10
+
+
+def test_watermark_does_not_move_when_a_page_fails(server):
+    tracker = make_tracker(server)
+    tracker.get_recent_trends("Docker")
+    state = tracker.trend_index.state("Docker", "hacker_news")
+
+    server.hn_hits += [story(i, state["watermark"] + 1) for i in range(150)]
+    server.failures.add("hn")
+    with pytest.raises(Exception):
+        tracker.get_recent_trends("Docker")
+
+    assert tracker.trend_index.state("Docker", "hacker_news")["watermark"] == state["watermark"]
+
+
+def test_refresh_rescores_recent_stories(server):
+    tracker = make_tracker(server)
+    tracker.get_recent_trends("Docker")
+    points_before = sum(day["points"] for day in tracker.get_trend_activity("Docker"))
+
+    server.hn_hits[0]["points"] += 500
+    trends = tracker.get_recent_trends("Docker")
+
+    assert trends[0]["title"] == "Docker story 1"
+    assert trends[0]["points"] == 510
+    activity = tracker.get_trend_activity("Docker")
+    assert sum(day["points"] for day in activity) == points_before + 500
+    assert sum(day["items"] for day in activity) == len(HN_HITS)
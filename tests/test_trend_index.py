@@ -0,0 +1,32 @@
+import time
+
+import pytest
+
+from utils.trend_index import TrendIndex
+
+
+def story(item_id, published_at, points, comments=0):
+    return {
+        "id": item_id, "published_at": published_at, "points": points, "comments": comments,
+        "payload": {"title": item_id, "points": points, "comments": comments}
+    }
+
+
+def test_items_are_ordered_and_limited_in_sql():
+    index = TrendIndex(":memory:")
+    now = time.time()
+    index.add_items("Rust", "hacker_news", [
+        story("old", now - 300, 50), story("top", now - 200, 90, comments=1), story("new", now - 100, 50, comments=7)
+    ], covered_from=now - 3600)
+
+    assert [item["title"] for item in index.items("Rust", "hacker_news", now - 3600, order_by="points", limit=2)] \
+        == ["top", "new"]
+    assert [item["title"] for item in index.items("Rust", "hacker_news", now - 3600)] == ["new", "top", "old"]
+    assert [item["title"] for item in index.items("Rust", "hacker_news", now - 3600, order_by="comments",
+                                                  limit=1)] == ["new"]
+    assert index.items("Rust", "hacker_news", now - 150) == [{"title": "new", "points": 50, "comments": 7}]
+
+
+def test_unknown_order_is_rejected():
+    with pytest.raises(ValueError):
+        TrendIndex(":memory:").items("Rust", "hacker_news", 0, order_by="payload")
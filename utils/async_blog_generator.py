@@ -0,0 +1,267 @@
+import asyncio
+import copy
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from utils.blog_generator import SECTIONS, BlogGenerator
+from utils.cache import DiskCache, normalize_text
+from utils.tokens import estimate_request_tokens
+from utils.tracing import record_usage, span, start_trace, submit_in_context
+
+
+class AsyncBlogGenerator(BlogGenerator):
+    """
+    BlogGenerator with asyncio-native generation methods.
+
+    Chat completions go through an AsyncOpenAI client that owns a pooled httpx
+    connection pool with keep-alive, so one event loop can drive many generations
+    without a thread per request. Exa has no async client; searches (with their
+    cache and rate limiting), context packing and every SQLite cache lookup or
+    write run on a small thread pool, so the event loop never blocks on disk.
+
+    The pooled client and the in-flight request table belong to the event loop
+    that first uses them: use one instance per loop and call aclose() when done.
+    The synchronous methods of BlogGenerator keep working alongside.
+    """
+
+    def __init__(self, *args, async_openai_client=None, max_connections: Optional[int] = None,
+                 max_keepalive_connections: Optional[int] = None, keepalive_expiry: float = 30.0,
+                 search_workers: Optional[int] = None, **kwargs):
+        """
+        async_openai_client can be injected for testing and benchmarking; it needs an
+        awaitable chat.completions.create(). The remaining arguments are BlogGenerator's.
+        """
+        super().__init__(*args, **kwargs)
+        self._async_openai = async_openai_client
+        self.max_connections = max_connections or int(os.getenv("OPENAI_MAX_CONNECTIONS", 100))
+        self.max_keepalive_connections = max_keepalive_connections or int(
+            os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 20)
+        )
+        self.keepalive_expiry = keepalive_expiry
+        self.search_workers = search_workers or int(os.getenv("SEARCH_WORKERS", 8))
+        self._search_executor = None
+        self._in_flight = {}
+
+    @property
+    def async_openai(self):
+        """AsyncOpenAI client with a keep-alive connection pool, created on first use."""
+        if self._async_openai is None:
+            with self._client_lock:
+                if self._async_openai is None:
+                    import httpx
+                    from openai import AsyncOpenAI
+                    self._async_openai = AsyncOpenAI(
+                        api_key=self.openai_api_key,
+                        max_retries=0,
+                        http_client=httpx.AsyncClient(
+                            limits=httpx.Limits(
+                                max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_keepalive_connections,
+                                keepalive_expiry=self.keepalive_expiry
+                            ),
+                            timeout=httpx.Timeout(600.0, connect=10.0)
+                        )
+                    )
+        return self._async_openai
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections and the search thread pool."""
+        if self._async_openai is not None and hasattr(self._async_openai, "close"):
+            await self._async_openai.close()
+        if self._search_executor is not None:
+            self._search_executor.shutdown(wait=False)
+
+    async def _run_blocking(self, fn, *args, **kwargs):
+        """Run a blocking call on the search thread pool, keeping the current trace."""
+        if self._search_executor is None:
+            self._search_executor = ThreadPoolExecutor(max_workers=self.search_workers, thread_name_prefix="exa")
+        return await asyncio.wrap_future(submit_in_context(self._search_executor, fn, *args, **kwargs))
+
+    async def _acomplete(self, request: Dict, stage: str = "completion", **attributes) -> str:
+        """Run a rate-limited async chat completion and return the message text."""
+        estimated_tokens = estimate_request_tokens(request)
+        with span(stage, model=request["model"], **attributes) as record:
+            completion = await self.rate_limiter.call_async(
+                request["model"], self._acreate_completion, tokens=estimated_tokens, **request
+            )
+            record_usage(record, completion)
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            self.rate_limiter.adjust(request["model"], usage.total_tokens - estimated_tokens)
+        return completion.choices[0].message.content
+
+    async def _acreate_completion(self, **request):
+        """Async counterpart of _create_completion."""
+        start = time.perf_counter()
+        try:
+            completion = await self.async_openai.chat.completions.create(**request)
+        except Exception:
+            self.model_router.record(request["model"], failed=True)
+            raise
+        usage = getattr(completion, "usage", None)
+        self.model_router.record(
+            request["model"], time.perf_counter() - start, usage.completion_tokens if usage is not None else None
+        )
+        return completion
+
+    async def _agenerate_search_query(self, topic: str, style: str) -> str:
+        """Async counterpart of _generate_search_query, sharing its memo and disk cache."""
+        with span("search_query", mode=self.query_mode) as record:
+            if self.query_mode == "template":
+                query, record["source"] = self._template_search_query(topic, style), "template"
+            else:
+                key = DiskCache.make_key(normalize_text(topic), normalize_text(style))
+                query, record["source"] = await self._run_blocking(self._lookup_search_query, key)
+                if query is None:
+                    request = self._search_query_request(topic, style)
+                    query, record["source"] = await self._acomplete(request, stage="query_rewrite"), "llm"
+                    await self._run_blocking(self._store_search_query, key, query, "llm")
+        self._record_query_timing(record["source"], record["seconds"])
+        return query
+
+    async def _asearch_for_topic(self, topic: str, style: str) -> List:
+        """Async counterpart of _search_for_topic, including the pipelined mode."""
+        if not self.pipelined:
+            query = await self._agenerate_search_query(topic, style)
+            return await self._run_blocking(self._search_recent_content, query)
+
+        raw = asyncio.ensure_future(self._run_blocking(self._search_recent_content, topic))
+        try:
+            query = await self._agenerate_search_query(topic, style)
+        except Exception:
+            return await raw
+        if normalize_text(query) == normalize_text(topic):
+            return await raw
+
+        # Searches left running finish on the thread pool and warm the search cache
+        rewritten = asyncio.ensure_future(self._run_blocking(self._search_recent_content, query))
+        await asyncio.wait({rewritten}, timeout=self.speculative_deadline)
+        if not rewritten.done():
+            await asyncio.wait({raw, rewritten}, return_when=asyncio.FIRST_COMPLETED)
+            if raw.done() and raw.exception() is None:
+                return raw.result()
+            return await rewritten
+        if rewritten.exception() is not None:
+            return await raw
+        if raw.done() and raw.exception() is None:
+            return self._merge_search_results(rewritten.result(), raw.result())
+        return rewritten.result()
+
+    async def _agenerate_sections(self, topic: str, context: str, style: str, length: str,
+                                  model_config: Optional[Dict] = None) -> tuple:
+        """
+        Async counterpart of _generate_sections, returning (title, {section: text}).
+
+        The title and section completions run concurrently, at most max_section_workers
+        at a time, and go through the section cache. If one fails the others are
+        cancelled and a RuntimeError naming the failed part is raised.
+        """
+        word_count, _ = self._get_length_instruction(length)
+        model_config = model_config or self._get_model_config(length)
+        section_word_count = word_count // len(SECTIONS)
+        semaphore = asyncio.Semaphore(max(1, self.max_section_workers))
+
+        async def cached(key: str, request: Dict, stage: str, **attributes) -> str:
+            text = await self._run_blocking(self._cached_section, key)
+            if text is None:
+                async with semaphore:
+                    text = await self._acomplete(request, stage=stage, **attributes)
+                text = text.strip() if stage == "title" else text
+                await self._run_blocking(self.section_cache.set, key, text)
+            return text
+
+        tasks = {"title": asyncio.ensure_future(cached(
+            self._section_key(topic, style, "title", context, model_config),
+            self._title_request(topic, style, model_config), "title"
+        ))}
+        for index, section in enumerate(SECTIONS):
+            tasks[section] = asyncio.ensure_future(cached(
+                self._section_key(topic, style, section, context, model_config, section_word_count),
+                self._section_request(
+                    topic, context, style, section, index, len(SECTIONS), section_word_count, model_config
+                ),
+                "section", section=section
+            ))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except Exception:
+            for task in tasks.values():
+                task.cancel()
+            label, error = next(
+                (label, task.exception()) for label, task in tasks.items()
+                if task.done() and not task.cancelled() and task.exception() is not None
+            )
+            raise RuntimeError(f"Failed to generate {label}: {error}") from error
+
+        return tasks["title"].result(), {section: tasks[section].result() for section in SECTIONS}
+
+    async def _agenerate_content(self, topic: str, context: str, style: str, length: str,
+                                 model_config: Optional[Dict] = None) -> Dict:
+        """Async counterpart of _generate_content, from an already built context and routed config."""
+        model_config = model_config or self._get_model_config(length)
+        if length != "very_long":
+            _, length_instruction = self._get_length_instruction(length)
+            content = await self._acomplete(
+                self._single_chunk_request(topic, context, style, length_instruction, model_config),
+                stage="single_chunk"
+            )
+            return self._assemble_content(topic, content, style, length)
+
+        title, parts = await self._agenerate_sections(topic, context, style, length, model_config)
+        # Stores the context in the section cache
+        return await self._run_blocking(
+            self._assemble_content, topic, self._join_sections(title, parts), style, length, parts, context
+        )
+
+    async def _agenerate_blog_post(self, topic: str, style: str, length: str) -> Dict:
+        """Run the full search and generation pipeline for a blog post."""
+        with start_trace("blog_post") as trace:
+            search_results = await self._asearch_for_topic(topic, style)
+            model_config = self._get_model_config(length)
+            context = await self._run_blocking(self._build_context, topic, search_results, length, model_config)
+            content = await self._agenerate_content(topic, context, style, length, model_config)
+        return self._attach_trace(content, trace)
+
+    async def _agenerate_and_cache(self, parts: tuple, topic: str, style: str, length: str) -> Dict:
+        """Generate a blog post and store it in the article cache, even if every caller has gone."""
+        result = await self._agenerate_blog_post(topic, style, length)
+        await self._run_blocking(self.result_cache.set, parts, result)
+        return result
+
+    def _finish_flight(self, key: str, flight: asyncio.Future) -> None:
+        """Remove a finished flight from the in-flight table."""
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
+    async def agenerate_blog_post(self, topic: str, style: str = "technical", length: str = "medium") -> Dict:
+        """
+        Async counterpart of generate_blog_post.
+
+        Uses the same finished-article cache; concurrent identical requests on the
+        event loop share one generation.
+        """
+        parts = ("blog_post", topic, style, length)
+        cached = await self._run_blocking(self.result_cache.get, parts)
+        if cached is not None:
+            return cached
+
+        key = self.result_cache.key(parts)
+        shared = key in self._in_flight
+        if not shared:
+            flight = asyncio.ensure_future(self._agenerate_and_cache(parts, topic, style, length))
+            # The flight outlives its callers; it leaves the table once it is cached (or failed)
+            flight.add_done_callback(lambda done: self._finish_flight(key, done))
+            self._in_flight[key] = flight
+        # Shielded so that one cancelled caller does not cancel the shared generation
+        result = await asyncio.shield(self._in_flight[key])
+
+        result = copy.deepcopy(result)
+        result.setdefault("metadata", {})["result_cache"] = "shared" if shared else "miss"
+        return result
+
+    async def agenerate_tutorial(self, topic: str, difficulty: str = "intermediate") -> Dict:
+        """Async counterpart of generate_tutorial."""
+        return await self.agenerate_blog_post(topic, style="Tutorial")
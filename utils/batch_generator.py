@@ -0,0 +1,246 @@
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Union
+
+CONTENT_TYPES = ["Blog Post", "Tutorial", "Technical Guide", "Trend Report"]
+
+FILE_EXTENSIONS = {
+    "markdown": "md",
+    "html": "html",
+    "json": "json",
+    "frontmatter": "fm.md"
+}
+
+JOB_DEFAULTS = {
+    "style": "Technical",
+    "length": "medium",
+    "content_type": "Blog Post",
+    "difficulty": "Intermediate"
+}
+
+
+def slugify(text: str) -> str:
+    """Turn a topic into a filesystem-friendly name."""
+    slug = re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+    return slug[:80] or "untitled"
+
+
+class BatchGenerator:
+    """
+    Generate many articles with bounded concurrency.
+
+    Jobs are dicts with a "topic" and optional "style", "length", "content_type"
+    and "difficulty" keys. Transient API failures are retried per request by the
+    generators' RateLimiter, so a job that raises has already exhausted its retries
+    (or failed permanently) and is not run again. Each job has a wall-clock timeout.
+    Results are formatted with ContentProcessor and written to disk as soon as each
+    job finishes. With a SiteExporter, each article is also added to the static site
+    as it finishes.
+    """
+
+    def __init__(self, blog_generator, content_processor, tech_tracker=None, workers: int = 4,
+                 timeout: float = 600.0, site_exporter=None):
+        self.blog_generator = blog_generator
+        self.content_processor = content_processor
+        self.tech_tracker = tech_tracker
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.site_exporter = site_exporter
+
+    @staticmethod
+    def load_jobs(path: str) -> List[Dict]:
+        """Load jobs from a .jsonl, .json or .csv file."""
+        with open(path, newline="", encoding="utf-8") as f:
+            if path.endswith(".csv"):
+                jobs = list(csv.DictReader(f))
+            elif path.endswith(".json"):
+                jobs = json.load(f)
+            else:
+                jobs = [json.loads(line) for line in f if line.strip()]
+        return [BatchGenerator.normalize_job(job) for job in jobs]
+
+    @staticmethod
+    def normalize_job(job: Dict) -> Dict:
+        """Fill in job defaults and validate the content type."""
+        if not job.get("topic"):
+            raise ValueError(f"Job is missing a topic: {job}")
+        normalized = dict(JOB_DEFAULTS)
+        normalized.update({key: value for key, value in job.items() if value not in (None, "")})
+        if normalized["content_type"] not in CONTENT_TYPES:
+            raise ValueError(f"Unsupported content type: {normalized['content_type']}")
+        return normalized
+
+    def _generate(self, job: Dict) -> Dict:
+        """Generate the content for a single job, dispatching on content type like the app."""
+        if job["content_type"] == "Tutorial":
+            content = self.blog_generator.generate_tutorial(job["topic"], job["difficulty"])
+        elif job["content_type"] == "Trend Report":
+            if self.tech_tracker is None:
+                raise ValueError("Trend Report jobs require a TechTracker")
+            content = self.tech_tracker.generate_trend_report(job["topic"])
+        else:
+            content = self.blog_generator.generate_blog_post(job["topic"], job["style"], job["length"])
+        return self.content_processor.add_metadata(content)
+
+    def _write_result(self, index: int, job: Dict, content: Dict, output_dir: str, formats: List[str]) -> List[str]:
+        """Render a finished job in every requested format in one pass and write the files."""
+        rendered = self.content_processor.render(content, formats)
+        paths = []
+        if self.site_exporter is not None:
+            self.site_exporter.add(content)
+        for output_format, formatted in rendered.items():
+            filename = f"{index:04d}_{slugify(job['topic'])}.{FILE_EXTENSIONS[output_format]}"
+            path = os.path.join(output_dir, filename)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(formatted)
+            paths.append(path)
+        return paths
+
+    def run(self, jobs: List[Dict], output_dir: str, output_format: Union[str, List[str]] = "markdown",
+            on_result: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Run every job and write the results to output_dir.
+
+        output_format may be a single format or a list; every format is rendered
+        from one assembled document.
+
+        on_result, if given, is called with a result record as each job finishes.
+        Returns a summary with throughput and failures, which is also written to
+        summary.json in the output directory.
+
+        Python threads cannot be interrupted, so a timed-out job is reported as failed
+        and its worker is abandoned. The pool can grow to one thread per job, so abandoned
+        workers never delay the jobs still to run; at most `workers` jobs run at once.
+        """
+        formats = [output_format] if isinstance(output_format, str) else list(output_format)
+        for fmt in formats:
+            if fmt not in FILE_EXTENSIONS:
+                raise ValueError(f"Unsupported format: {fmt}")
+        os.makedirs(output_dir, exist_ok=True)
+        jobs = [self.normalize_job(job) for job in jobs]
+
+        start = time.monotonic()
+        started = {}
+        records = []
+        queue = list(enumerate(jobs))
+        queue.reverse()
+        running = {}
+        # Threads are only started when no idle one is left, so this is an upper bound
+        executor = ThreadPoolExecutor(max_workers=max(1, len(jobs)), thread_name_prefix="batch")
+
+        def finish(record: Dict) -> None:
+            records.append(record)
+            if on_result is not None:
+                on_result(record)
+
+        try:
+            while queue or running:
+                while queue and len(running) < self.workers:
+                    index, job = queue.pop()
+                    started[index] = time.monotonic()
+                    running[executor.submit(self._generate, job)] = (index, job)
+
+                now = time.monotonic()
+                deadlines = [started[index] + self.timeout for index, _ in running.values()]
+                wait_for = max(0.0, min(deadlines) - now) if deadlines else 1.0
+                done, _ = wait(list(running), timeout=min(wait_for, 1.0), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index, job = running.pop(future)
+                    record = {"index": index, "job": job, "seconds": round(time.monotonic() - started[index], 3)}
+                    try:
+                        record["paths"] = self._write_result(index, job, future.result(), output_dir, formats)
+                        record["status"] = "ok"
+                    except Exception as e:
+                        record["status"] = "failed"
+                        record["error"] = str(e)
+                    finish(record)
+
+                now = time.monotonic()
+                for future, (index, job) in list(running.items()):
+                    if now - started[index] > self.timeout:
+                        running.pop(future)
+                        future.cancel()
+                        finish({
+                            "index": index,
+                            "job": job,
+                            "seconds": round(now - started[index], 3),
+                            "status": "failed",
+                            "error": f"Timed out after {self.timeout}s"
+                        })
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.monotonic() - start
+        failures = [record for record in records if record["status"] != "ok"]
+        summary = {
+            "total": len(jobs),
+            "succeeded": len(records) - len(failures),
+            "failed": len(failures),
+            "elapsed_seconds": round(elapsed, 3),
+            "jobs_per_minute": round(len(records) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "failures": [
+                {"index": record["index"], "topic": record["job"]["topic"], "error": record["error"]}
+                for record in sorted(failures, key=lambda r: r["index"])
+            ]
+        }
+        if self.site_exporter is not None:
+            summary["site"] = self.site_exporter.finish()
+        with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point: python -m utils.batch_generator jobs.jsonl -o output/"""
+    parser = argparse.ArgumentParser(description="Generate a batch of technical articles.")
+    parser.add_argument("jobs", help="Jobs file (.jsonl, .json or .csv) with topic, style, length and content_type")
+    parser.add_argument("-o", "--output-dir", default="output", help="Directory for generated files")
+    parser.add_argument("-f", "--format", nargs="+", default=["markdown"], choices=list(FILE_EXTENSIONS),
+                        help="Output formats, all rendered from one pass")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Concurrent jobs")
+    parser.add_argument("--retries", type=int,
+                        help="Retries per API request on transient failures (default: RATE_LIMIT_MAX_RETRIES)")
+    parser.add_argument("--backoff", type=float, help="Initial retry backoff in seconds (default: 1)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Per-job timeout in seconds")
+    parser.add_argument("--site-dir", help="Also export the articles to this static site directory")
+    parser.add_argument("--archive", help="With --site-dir, write the site to this .tar.gz file afterwards")
+    args = parser.parse_args(argv)
+
+    from utils.blog_generator import BlogGenerator
+    from utils.content_processor import ContentProcessor
+    from utils.rate_limiter import get_rate_limiter
+    from utils.site_exporter import SiteExporter
+    from utils.tech_tracker import TechTracker
+
+    # Retries happen once, per request, in the limiter every generator shares
+    rate_limiter = get_rate_limiter()
+    if args.retries is not None:
+        rate_limiter.max_retries = max(0, args.retries)
+    if args.backoff is not None:
+        rate_limiter.base_delay = args.backoff
+
+    content_processor = ContentProcessor()
+    site_exporter = SiteExporter(content_processor, args.site_dir) if args.site_dir else None
+    batch = BatchGenerator(
+        BlogGenerator(), content_processor, TechTracker(),
+        workers=args.workers, timeout=args.timeout, site_exporter=site_exporter
+    )
+
+    def report(record: Dict) -> None:
+        status = ", ".join(record.get("paths", [])) or record.get("error")
+        print(f"[{record['status']}] {record['job']['topic']} ({record['seconds']}s): {status}", flush=True)
+
+    summary = batch.run(batch.load_jobs(args.jobs), args.output_dir, args.format, on_result=report)
+    if site_exporter is not None and args.archive:
+        summary["site"]["archive"] = site_exporter.write_archive(args.archive)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,334 @@
+import copy
+import hashlib
 import os
-import openai
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
 from dotenv import load_dotenv
-from exa_py import Exa
+from utils.cache import DiskCache, normalize_text
+from utils.code_extractor import FenceParser, dedupe_code_blocks, extract_code_blocks
+from utils.context_builder import ContextBuilder
+from utils.model_router import ModelRouter, get_model_router, router_settings
+from utils.rate_limiter import RateLimiter, get_rate_limiter
+from utils.result_cache import ResultCache
+from utils.tokens import estimate_request_tokens, estimate_tokens
+from utils.tracing import record_cache, record_usage, span, start_trace, submit_in_context
 
 load_dotenv()
 
+# Sections used for very long articles, in output order
+SECTIONS = [
+    "Introduction and Background",
+    "Main Concepts and Technical Details",
+    "Analysis and Implementation",
+    "Advanced Topics and Future Implications",
+    "Conclusion and Key Takeaways"
+]
+
+# Search result attributes kept when caching Exa results
+RESULT_FIELDS = ["id", "url", "title", "text", "published_date", "author", "score"]
+
+# Search focus per content style, shared by the LLM and template query modes
+SEARCH_STYLE_HINTS = {
+    "Technical": "technical details and implementation",
+    "Tutorial": "tutorials and how-to guides",
+    "Overview": "high-level concepts and introductions",
+    "Deep Dive": "in-depth analysis and advanced concepts"
+}
+
+QUERY_MODES = ["llm", "template"]
+
+# Number of rewritten queries kept in memory in front of the disk cache
+QUERY_MEMO_SIZE = 256
+
+# Context window per model family, in tokens
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192
+}
+
+# Tokens reserved for the prompt template around the search context
+PROMPT_OVERHEAD_TOKENS = 400
+
 class BlogGenerator:
-    def __init__(self):
+    def __init__(self, max_section_workers: Optional[int] = None, search_cache: Optional[DiskCache] = None,
+                 query_mode: Optional[str] = None, query_cache: Optional[DiskCache] = None,
+                 pipelined: Optional[bool] = None, speculative_deadline: Optional[float] = None,
+                 rate_limiter: Optional[RateLimiter] = None, exa_client=None, openai_client=None,
+                 result_cache: Optional[ResultCache] = None, section_cache: Optional[DiskCache] = None,
+                 model_router: Optional[ModelRouter] = None):
+        """
+        Clients can be injected for testing and benchmarking: exa_client needs
+        search_and_contents() and openai_client needs chat.completions.create().
+        API keys are only required for the clients that are not injected.
+        """
         self.exa_api_key = os.getenv("EXA_API_KEY")
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         
-        if not self.exa_api_key:
+        if exa_client is None and not self.exa_api_key:
             raise ValueError("EXA_API_KEY not found in environment variables")
-        if not self.openai_api_key:
+        if openai_client is None and not self.openai_api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
             
-        self.exa = Exa(self.exa_api_key)
-        openai.api_key = self.openai_api_key
+        # The SDK clients are imported and built on first use, keeping construction cheap
+        self._exa = exa_client
+        self._openai_client = openai_client
+        self._client_lock = threading.Lock()
 
-    def _generate_search_query(self, topic: str, style: str) -> str:
-        """Generate an optimized search query using OpenAI."""
+        # Every OpenAI and Exa call goes through the shared client-side rate limiter
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
+        # Picks each request's model from observed latency, failures and rate limit headroom;
+        # the shared router goes with the shared limiter
+        if model_router is None:
+            model_router = get_model_router() if rate_limiter is None else ModelRouter(rate_limiter, **router_settings())
+        self.model_router = model_router
+
+        # Deduplicates search results and packs the best passages into the prompt
+        self.context_builder = ContextBuilder()
+
+        # Finished articles, shared by identical requests within a freshness window
+        self.result_cache = result_cache or ResultCache(
+            "articles",
+            ttl=float(os.getenv("ARTICLE_CACHE_TTL", 3600)),
+            max_entries=int(os.getenv("ARTICLE_CACHE_MAX_ENTRIES", 200)),
+            freshness=float(os.getenv("ARTICLE_CACHE_FRESHNESS", 3600)),
+            enabled=os.getenv("ARTICLE_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        )
+
+        # Sections and titles of very_long articles, and the contexts they were written from
+        self.section_cache = section_cache or DiskCache(
+            "sections",
+            ttl=float(os.getenv("SECTION_CACHE_TTL", 7 * 24 * 3600)),
+            max_entries=int(os.getenv("SECTION_CACHE_MAX_ENTRIES", 2000)),
+            enabled=os.getenv("SECTION_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        )
+
+        # Concurrency cap for very_long section generation (sections + title)
+        self.max_section_workers = max_section_workers or int(os.getenv("SECTION_CONCURRENCY", len(SECTIONS) + 1))
+
+        # Exa results cache shared by every search call site
+        self.search_cache = search_cache or DiskCache(
+            "exa_search",
+            ttl=float(os.getenv("SEARCH_CACHE_TTL", 6 * 3600)),
+            max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 500)),
+            enabled=os.getenv("SEARCH_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        )
+
+        # Search query rewriting: "llm" asks gpt-3.5-turbo, "template" builds the query locally
+        self.query_mode = query_mode or os.getenv("SEARCH_QUERY_MODE", "llm")
+        if self.query_mode not in QUERY_MODES:
+            raise ValueError(f"Unsupported search query mode: {self.query_mode}")
+        self.query_cache = query_cache or DiskCache(
+            "search_query",
+            ttl=float(os.getenv("QUERY_CACHE_TTL", 7 * 24 * 3600)),
+            max_entries=int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 2000))
+        )
+        self._query_memo = {}
+        self._query_lock = threading.Lock()
+        self.query_timings = {}
+
+        # Pipelined mode searches the raw topic while the query is being rewritten
+        if pipelined is None:
+            pipelined = os.getenv("SEARCH_PIPELINED", "").lower() in ("1", "true", "yes")
+        self.pipelined = pipelined
+        self.speculative_deadline = speculative_deadline or float(os.getenv("SPECULATIVE_SEARCH_DEADLINE", 2.0))
+
+    @property
+    def exa(self):
+        """Exa client, created on first use."""
+        if self._exa is None:
+            with self._client_lock:
+                if self._exa is None:
+                    from exa_py import Exa
+                    self._exa = Exa(self.exa_api_key)
+        return self._exa
+
+    @property
+    def openai_client(self):
+        """OpenAI client, the configured openai module unless one was injected."""
+        if self._openai_client is None:
+            with self._client_lock:
+                if self._openai_client is None:
+                    import openai
+                    openai.api_key = self.openai_api_key
+                    # The rate limiter schedules every retry; SDK retries would bypass it
+                    openai.max_retries = 0
+                    self._openai_client = openai
+        return self._openai_client
+
+    def _record_query_timing(self, source: str, elapsed: float) -> None:
+        """Accumulate search query stage timings per source (llm, template, memory, disk)."""
+        with self._query_lock:
+            stats = self.query_timings.setdefault(source, {"count": 0, "seconds": 0.0})
+            stats["count"] += 1
+            stats["seconds"] += elapsed
+
+    def _template_search_query(self, topic: str, style: str) -> str:
+        """Build a search query locally from the topic and style hint."""
+        hint = SEARCH_STYLE_HINTS.get(style)
+        return f"{topic} {hint}" if hint else topic
+
+    def _search_query_request(self, topic: str, style: str) -> Dict:
+        """Build the chat completion request that rewrites a topic into a search query."""
         prompt = f"Generate a search query to find recent information about {topic} "
-        if style == "Technical":
-            prompt += "focusing on technical details and implementation"
-        elif style == "Tutorial":
-            prompt += "focusing on tutorials and how-to guides"
-        elif style == "Overview":
-            prompt += "focusing on high-level concepts and introductions"
-        elif style == "Deep Dive":
-            prompt += "focusing on in-depth analysis and advanced concepts"
-
-        completion = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
+        if style in SEARCH_STYLE_HINTS:
+            prompt += f"focusing on {SEARCH_STYLE_HINTS[style]}"
+
+        return {
+            "model": "gpt-3.5-turbo",
+            "messages": [
                 {"role": "system", "content": "Generate a concise search query based on the topic and style. Only return the query text."},
                 {"role": "user", "content": prompt}
             ]
-        )
-        return completion.choices[0].message.content
+        }
+
+    def _llm_search_query(self, topic: str, style: str) -> str:
+        """Generate an optimized search query using OpenAI."""
+        return self._complete(self._search_query_request(topic, style), stage="query_rewrite")
+
+    def _resolve_search_query(self, topic: str, style: str, mode: str) -> tuple:
+        """Return the search query and where it came from (template, memory, disk or llm)."""
+        if mode == "template":
+            return self._template_search_query(topic, style), "template"
+
+        key = DiskCache.make_key(normalize_text(topic), normalize_text(style))
+        query, source = self._lookup_search_query(key)
+        if query is None:
+            query, source = self._llm_search_query(topic, style), "llm"
+            self._store_search_query(key, query, source)
+        return query, source
+
+    def _lookup_search_query(self, key: str) -> tuple:
+        """Return a memoized (query, source) from memory or disk, or (None, None) on a miss."""
+        with self._query_lock:
+            query = self._query_memo.get(key)
+        if query is not None:
+            record_cache("search_query", True)
+            return query, "memory"
+
+        query = self.query_cache.get(key)
+        if query is None:
+            return None, None
+        self._store_search_query(key, query, "disk")
+        return query, "disk"
+
+    def _store_search_query(self, key: str, query: str, source: str) -> None:
+        """Memoize a query in memory, and on disk when it was just generated."""
+        if source == "llm":
+            self.query_cache.set(key, query)
+        record_cache("search_query", source == "disk")
+
+        with self._query_lock:
+            if len(self._query_memo) >= QUERY_MEMO_SIZE:
+                self._query_memo.pop(next(iter(self._query_memo)))
+            self._query_memo[key] = query
+
+    def _generate_search_query(self, topic: str, style: str, mode: Optional[str] = None) -> str:
+        """
+        Generate a search query for the topic and style.
 
-    def _search_recent_content(self, query: str, days: int = 30) -> List[Dict]:
-        """Search for recent content using Exa."""
+        In "llm" mode rewritten queries are memoized in memory and on disk, keyed on the
+        normalized topic and style. "template" mode skips the LLM call entirely.
+        """
+        mode = mode or self.query_mode
+        with span("search_query", mode=mode) as record:
+            query, record["source"] = self._resolve_search_query(topic, style, mode)
+        self._record_query_timing(record["source"], record["seconds"])
+        return query
+
+    def _search_recent_content(self, query: str, days: int = 30, use_cache: bool = True) -> List:
+        """
+        Search for recent content using Exa.
+
+        Results are cached on the normalized query and the date cutoff, so repeated
+        searches within the same day reuse the stored results. Pass use_cache=False
+        to bypass the cache and force a fresh search.
+        """
         date_cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        search_response = self.exa.search_and_contents(
-            query,
-            use_autoprompt=True,
-            start_published_date=date_cutoff
-        )
-        return search_response.results
+        cache_key = DiskCache.make_key(normalize_text(query), date_cutoff)
+
+        with span("search", query=query) as record:
+            if use_cache:
+                cached = self.search_cache.get(cache_key)
+                record_cache("exa_search", cached is not None)
+                if cached is not None:
+                    record["cache_hit"] = True
+                    record["results"] = len(cached)
+                    return [SimpleNamespace(**result) for result in cached]
+
+            search_response = self.rate_limiter.call(
+                "exa",
+                self.exa.search_and_contents,
+                query,
+                use_autoprompt=True,
+                start_published_date=date_cutoff
+            )
+            results = search_response.results
+            self.search_cache.set(cache_key, [
+                {field: getattr(result, field, None) for field in RESULT_FIELDS}
+                for result in results
+            ])
+            record["cache_hit"] = False
+            record["results"] = len(results)
+            return results
+
+    def _merge_search_results(self, primary: List, secondary: List) -> List:
+        """Merge two result lists, keeping primary order and dropping duplicate URLs."""
+        merged = list(primary)
+        seen = {getattr(result, "url", None) for result in primary}
+        for result in secondary:
+            url = getattr(result, "url", None)
+            if url not in seen:
+                seen.add(url)
+                merged.append(result)
+        return merged
+
+    def _pipelined_search(self, topic: str, style: str) -> List:
+        """
+        Search with the query rewrite and a speculative raw-topic search running in parallel.
+
+        Once the rewritten query is known, its search gets speculative_deadline seconds.
+        If it finishes in time the two result sets are merged (rewritten results first),
+        otherwise the speculative results are used on their own.
+        """
+        executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="search")
+        try:
+            raw_future = submit_in_context(executor, self._search_recent_content, topic)
+            query_future = submit_in_context(executor, self._generate_search_query, topic, style)
+
+            try:
+                query = query_future.result()
+            except Exception:
+                # Without a rewritten query the speculative search is all we have
+                return raw_future.result()
+
+            if normalize_text(query) == normalize_text(topic):
+                return raw_future.result()
+
+            rewritten_future = submit_in_context(executor, self._search_recent_content, query)
+            wait([rewritten_future], timeout=self.speculative_deadline)
+
+            if not rewritten_future.done():
+                # Deadline missed: use whichever search finishes first, preferring the speculative one
+                wait([raw_future, rewritten_future], return_when=FIRST_COMPLETED)
+                if raw_future.done() and raw_future.exception() is None:
+                    return raw_future.result()
+                return rewritten_future.result()
+
+            if rewritten_future.exception() is not None:
+                return raw_future.result()
+
+            rewritten = rewritten_future.result()
+            if raw_future.done() and raw_future.exception() is None:
+                return self._merge_search_results(rewritten, raw_future.result())
+            return rewritten
+        finally:
+            # Searches still in flight finish in the background and warm the search cache
+            executor.shutdown(wait=False)
 
     def _get_length_instruction(self, length: str) -> tuple:
         """Get word count and instruction based on desired length."""
@@ -62,97 +341,89 @@ class BlogGenerator:
         return length_configs.get(length, length_configs["medium"])
 
     def _get_model_config(self, length: str) -> Dict:
-        """Get model configuration based on content length."""
+        """
+        Get the model configuration for one request, routed once per request.
+
+        The model router may switch from the preferred config to a faster model or
+        a smaller token budget when the preferred model is degraded; every stage of
+        the request (context budget and completions) must use the same routed config.
+        """
+        return self.model_router.route(self._preferred_model_config(length))
+
+    def _preferred_model_config(self, length: str) -> Dict:
+        """Get the preferred model configuration based on content length, before routing."""
         configs = {
             "short": {
                 "model": "gpt-3.5-turbo",
                 "max_tokens": 1200,  # ~800 words
+                "context_tokens": 600,  # search context budget
                 "temperature": 0.7,
                 "presence_penalty": 0.0
             },
             "medium": {
                 "model": "gpt-3.5-turbo",
                 "max_tokens": 2200,  # ~1500 words
+                "context_tokens": 1000,  # search context budget
                 "temperature": 0.7,
                 "presence_penalty": 0.1
             },
             "long": {
                 "model": "gpt-4",  # Using GPT-4 for better long-form content
                 "max_tokens": 3700,  # ~2500 words
+                "context_tokens": 3000,  # search context budget
                 "temperature": 0.75,
                 "presence_penalty": 0.2
             },
             "very_long": {
                 "model": "gpt-4",  # Using GPT-4 for better long-form content
                 "max_tokens": 6000,  # ~4000 words
+                "context_tokens": 3500,  # search context budget
                 "temperature": 0.8,
                 "presence_penalty": 0.3
             }
         }
         return configs.get(length, configs["medium"])
 
-    def _generate_content_in_chunks(self, topic: str, context: str, style: str, length: str) -> str:
-        """Generate content in chunks for very long articles."""
-        word_count, length_instruction = self._get_length_instruction(length)
-        model_config = self._get_model_config(length)
-        
-        if length != "very_long":
-            # For shorter content, generate in one go
-            return self._generate_single_chunk(topic, context, style, length_instruction, model_config)
-        
-        # For very long content, generate in sections
-        sections = [
-            "Introduction and Background",
-            "Main Concepts and Technical Details",
-            "Analysis and Implementation",
-            "Advanced Topics and Future Implications",
-            "Conclusion and Key Takeaways"
-        ]
-        
-        content_parts = []
-        section_word_count = word_count // len(sections)
-        
-        for i, section in enumerate(sections):
-            section_prompt = f"""Based on the following information about {topic}, create the {section} section.
+    def _section_request(self, topic: str, context: str, style: str, section: str, index: int,
+                         total: int, section_word_count: int, model_config: Dict) -> Dict:
+        """Build the completion arguments for one section of a very long article."""
+        section_prompt = f"""Based on the following information about {topic}, create the {section} section.
             
 {context}
 
-This is section {i+1} of {len(sections)}. Target length: ~{section_word_count} words.
+This is section {index+1} of {total}. Target length: ~{section_word_count} words.
 Style: {style}
 
 Make sure this section flows naturally with the other sections and maintains a cohesive narrative.
 """
-            
-            completion = openai.chat.completions.create(
-                model=model_config["model"],
-                messages=[
-                    {"role": "system", "content": "You are an expert technical writer creating a section of a comprehensive article."},
-                    {"role": "user", "content": section_prompt}
-                ],
-                max_tokens=model_config["max_tokens"] // len(sections),
-                temperature=model_config["temperature"],
-                presence_penalty=model_config["presence_penalty"]
-            )
-            
-            content_parts.append(completion.choices[0].message.content)
-        
-        # Generate title separately
+
+        return {
+            "model": model_config["model"],
+            "messages": [
+                {"role": "system", "content": "You are an expert technical writer creating a section of a comprehensive article."},
+                {"role": "user", "content": section_prompt}
+            ],
+            "max_tokens": model_config["max_tokens"] // total,
+            "temperature": model_config["temperature"],
+            "presence_penalty": model_config["presence_penalty"]
+        }
+
+    def _title_request(self, topic: str, style: str, model_config: Dict) -> Dict:
+        """Build the completion arguments for the title of a very long article."""
         title_prompt = f"Generate a compelling title for a comprehensive article about {topic} in {style} style."
-        title_completion = openai.chat.completions.create(
-            model=model_config["model"],
-            messages=[
+        return {
+            "model": model_config["model"],
+            "messages": [
                 {"role": "system", "content": "Generate only the title, nothing else."},
                 {"role": "user", "content": title_prompt}
             ],
-            max_tokens=50,
-            temperature=0.7
-        )
-        
-        title = title_completion.choices[0].message.content.strip()
-        return f"# {title}\n\n" + "\n\n".join(content_parts)
+            "max_tokens": 50,
+            "temperature": 0.7
+        }
 
-    def _generate_single_chunk(self, topic: str, context: str, style: str, length_instruction: str, model_config: Dict) -> str:
-        """Generate content in a single chunk for shorter articles."""
+    def _single_chunk_request(self, topic: str, context: str, style: str, length_instruction: str,
+                              model_config: Dict) -> Dict:
+        """Build the completion arguments for a shorter article generated in one go."""
         style_instructions = {
             "Technical": "Create a technical blog post with detailed explanations and focus on implementation details.",
             "Tutorial": "Create a step-by-step tutorial that guides readers through learning and implementation.",
@@ -176,45 +447,342 @@ Generate a comprehensive blog post that includes:
 Use appropriate section breaks and formatting for better readability.
 """
 
-        completion = openai.chat.completions.create(
-            model=model_config["model"],
-            messages=[
+        return {
+            "model": model_config["model"],
+            "messages": [
                 {"role": "system", "content": "You are an expert technical writer who creates high-quality blog content."},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=model_config["max_tokens"],
-            temperature=model_config["temperature"],
-            presence_penalty=model_config["presence_penalty"]
-        )
+            "max_tokens": model_config["max_tokens"],
+            "temperature": model_config["temperature"],
+            "presence_penalty": model_config["presence_penalty"]
+        }
 
+    def _complete(self, request: Dict, stage: str = "completion", **attributes) -> str:
+        """Run a rate-limited chat completion and return the message text."""
+        estimated_tokens = estimate_request_tokens(request)
+        with span(stage, model=request["model"], **attributes) as record:
+            completion = self.rate_limiter.call(
+                request["model"], self._create_completion, tokens=estimated_tokens, **request
+            )
+            record_usage(record, completion)
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            self.rate_limiter.adjust(request["model"], usage.total_tokens - estimated_tokens)
         return completion.choices[0].message.content
 
-    def _generate_content(self, topic: str, search_results: List[Dict], style: str, length: str = "medium") -> Dict:
-        """Generate content using OpenAI based on search results."""
-        # Prepare context from search results
-        num_results = 7 if length in ["long", "very_long"] else 3
-        context = "\n\n".join([
-            f"Title: {result.title}\nContent: {result.text[:2000] if length in ['long', 'very_long'] else result.text[:500]}..."
-            for result in search_results[:num_results]
-        ])
+    def _create_completion(self, **request):
+        """Call the chat completions API once, recording the outcome for model routing."""
+        start = time.perf_counter()
+        try:
+            completion = self.openai_client.chat.completions.create(**request)
+        except Exception:
+            self.model_router.record(request["model"], failed=True)
+            raise
+        if not request.get("stream"):
+            usage = getattr(completion, "usage", None)
+            self.model_router.record(
+                request["model"], time.perf_counter() - start, usage.completion_tokens if usage is not None else None
+            )
+        return completion
+
+    def _stream_completion(self, request: Dict, stage: str = "completion", **attributes) -> Iterator[str]:
+        """
+        Run a rate-limited streaming chat completion and yield text deltas as they arrive.
+
+        Streamed responses carry no usage, so token counts on the span are estimates.
+        """
+        with span(stage, model=request["model"], streamed=True, **attributes) as record:
+            start = time.perf_counter()
+            stream = self.rate_limiter.call(
+                request["model"], self._create_completion,
+                tokens=estimate_request_tokens(request), stream=True, **request
+            )
+            text = ""
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text += chunk.choices[0].delta.content
+                    yield chunk.choices[0].delta.content
+            record["prompt_tokens"] = estimate_request_tokens(dict(request, max_tokens=0))
+            record["completion_tokens"] = estimate_tokens(text)
+        self.model_router.record(request["model"], time.perf_counter() - start, record["completion_tokens"])
+
+    @staticmethod
+    def _context_hash(context: str) -> str:
+        return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+    def _store_context(self, context: str) -> str:
+        """Keep the prompt context under its hash so sections can be regenerated from it; returns the hash."""
+        context_hash = self._context_hash(context)
+        self.section_cache.set(DiskCache.make_key("context", context_hash), context)
+        return context_hash
+
+    def _section_key(self, topic: str, style: str, section: str, context: str, model_config: Dict,
+                     section_word_count: Optional[int] = None) -> str:
+        """
+        Cache key of a section or the title of a very long article.
+
+        The title is keyed on the context too, so a new search context gets a new title.
+        Keyed on the model config the text is generated with (model, max_tokens, ...), so
+        output of a fallback model is never served to requests for the preferred one; why
+        a request was routed is left out.
+        """
+        context_hash = self._context_hash(context)
+        generation_config = {
+            name: value for name, value in model_config.items() if name not in ("routed_from", "route_reason")
+        }
+        return DiskCache.make_key(
+            normalize_text(topic), normalize_text(style), section, context_hash, generation_config, section_word_count
+        )
+
+    def _cached_section(self, key: str) -> Optional[str]:
+        """Look up a cached section or title, recording the lookup in the trace."""
+        cached = self.section_cache.get(key)
+        record_cache("sections", cached is not None)
+        return cached
+
+    def _generate_section(self, topic: str, context: str, style: str, section: str, index: int,
+                          total: int, section_word_count: int, model_config: Dict, use_cache: bool = True) -> str:
+        """
+        Generate a single section of a very long article.
+
+        Sections are cached on the topic, style, section, context hash and model config;
+        with use_cache=False a new version is generated and replaces the cached one.
+        """
+        key = self._section_key(topic, style, section, context, model_config, section_word_count)
+        text = self._cached_section(key) if use_cache else None
+        if text is None:
+            text = self._complete(self._section_request(
+                topic, context, style, section, index, total, section_word_count, model_config
+            ), stage="section", section=section)
+            self.section_cache.set(key, text)
+        return text
+
+    def _generate_title(self, topic: str, context: str, style: str, model_config: Dict,
+                        use_cache: bool = True) -> str:
+        """Generate a title for a very long article, cached like the sections."""
+        key = self._section_key(topic, style, "title", context, model_config)
+        title = self._cached_section(key) if use_cache else None
+        if title is None:
+            title = self._complete(self._title_request(topic, style, model_config), stage="title").strip()
+            self.section_cache.set(key, title)
+        return title
+
+    def _stream_section(self, key: str, request: Dict, stage: str, **attributes) -> Iterator[str]:
+        """Stream a section or title, replaying it in one piece when it is cached."""
+        cached = self._cached_section(key)
+        if cached is not None:
+            yield cached
+            return
+        text = ""
+        for delta in self._stream_completion(request, stage=stage, **attributes):
+            text += delta
+            yield delta
+        self.section_cache.set(key, text.strip() if stage == "title" else text)
+
+    def _submit_sections(self, executor: ThreadPoolExecutor, topic: str, context: str, style: str,
+                         length: str, model_config: Dict, sections: List[str], use_cache: bool = True) -> Dict:
+        """Submit section completions to the executor, returning futures keyed by section name."""
+        word_count, _ = self._get_length_instruction(length)
+        section_word_count = word_count // len(SECTIONS)
+        return {
+            section: submit_in_context(executor, self._generate_section, topic, context, style, section,
+                                       SECTIONS.index(section), len(SECTIONS), section_word_count, model_config,
+                                       use_cache)
+            for section in sections
+        }
+
+    def _section_result(self, future, label: str, pending: List) -> str:
+        """Return a section result, cancelling the pending futures if it failed."""
+        error = future.exception()
+        if error is not None:
+            for other in pending:
+                other.cancel()
+            raise RuntimeError(f"Failed to generate {label}: {error}") from error
+        return future.result()
+
+    def _generate_content_in_chunks(self, topic: str, context: str, style: str, length: str,
+                                    max_workers: Optional[int] = None, model_config: Optional[Dict] = None) -> str:
+        """
+        Generate content in chunks for very long articles.
+
+        All section prompts and the title prompt are sent concurrently on a bounded
+        thread pool and assembled in order. If any completion fails, the pending
+        ones are cancelled and a RuntimeError naming the failed part is raised.
+        """
+        word_count, length_instruction = self._get_length_instruction(length)
+        model_config = model_config or self._get_model_config(length)
+        
+        if length != "very_long":
+            # For shorter content, generate in one go
+            return self._generate_single_chunk(topic, context, style, length_instruction, model_config)
+        
+        # For very long content, generate in sections
+        title, parts = self._generate_sections(
+            topic, context, style, length, max_workers=max_workers, model_config=model_config
+        )
+        return self._join_sections(title, parts)
 
-        # Generate content
-        content = self._generate_content_in_chunks(topic, context, style, length)
+    def _generate_sections(self, topic: str, context: str, style: str, length: str,
+                           sections: Optional[List[str]] = None, title: bool = True, use_cache: bool = True,
+                           max_workers: Optional[int] = None, model_config: Optional[Dict] = None) -> tuple:
+        """
+        Generate the title and the given sections concurrently.
+
+        Returns (title, {section: text}); the title is None when title=False.
+        model_config is the request's routed config (routed here if not given).
+        """
+        model_config = model_config or self._get_model_config(length)
+        sections = SECTIONS if sections is None else sections
+        workers = max(1, min(max_workers or self.max_section_workers, len(sections) + int(title)))
 
-        # Extract title and content
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="section") as executor:
+            labels = {}
+            if title:
+                title_future = submit_in_context(
+                    executor, self._generate_title, topic, context, style, model_config, use_cache
+                )
+                labels[title_future] = "title"
+            section_futures = self._submit_sections(
+                executor, topic, context, style, length, model_config, sections, use_cache
+            )
+            labels.update({future: section for section, future in section_futures.items()})
+
+            for future in as_completed(labels):
+                self._section_result(future, labels[future], list(labels))
+
+            return (
+                title_future.result() if title else None,
+                {section: future.result() for section, future in section_futures.items()}
+            )
+
+    @staticmethod
+    def _join_sections(title: str, parts: Dict) -> str:
+        """Assemble the markdown of a very long article from its title and sections."""
+        return f"# {title}\n\n" + "\n\n".join(parts[section] for section in SECTIONS)
+
+    def _generate_single_chunk(self, topic: str, context: str, style: str, length_instruction: str, model_config: Dict) -> str:
+        """Generate content in a single chunk for shorter articles."""
+        return self._complete(
+            self._single_chunk_request(topic, context, style, length_instruction, model_config), stage="single_chunk"
+        )
+
+    def _context_token_budget(self, length: str, model_config: Dict) -> int:
+        """Token budget for search context, bounded by what the model's context window leaves free."""
+        completion_tokens = model_config["max_tokens"]
+        if length == "very_long":
+            completion_tokens //= len(SECTIONS)
+        window = next(
+            (size for name, size in MODEL_CONTEXT_WINDOWS.items() if model_config["model"].startswith(name)),
+            min(MODEL_CONTEXT_WINDOWS.values())
+        )
+        return max(0, min(model_config["context_tokens"], window - completion_tokens - PROMPT_OVERHEAD_TOKENS))
+
+    def _build_context(self, topic: str, search_results: List, length: str,
+                       model_config: Optional[Dict] = None) -> str:
+        """
+        Prepare the prompt context from deduplicated, ranked search result passages.
+
+        The budget is sized for model_config, the routed config the request's completions will use.
+        """
+        budget = self._context_token_budget(length, model_config or self._get_model_config(length))
+        with span("context", token_budget=budget, results=len(search_results)):
+            return self.context_builder.build(topic, search_results, budget)
+
+    def _assemble_content(self, topic: str, content: str, style: str, length: str,
+                          sections: Optional[Dict] = None, context: Optional[str] = None) -> Dict:
+        """
+        Split generated markdown into title and body and build the content dict.
+
+        Very long articles also record their sections and the hash of the stored
+        context they were written from, for regenerate_sections(). Without a section
+        cache to store it in, the context itself is kept in the content.
+        """
         lines = content.split("\n")
         title = lines[0].replace("# ", "").strip()
         main_content = "\n".join(lines[1:]).strip()
 
-        return {
+        assembled = {
             "title": title,
             "content": main_content,
             "date": datetime.now().strftime("%Y-%m-%d"),
             "tags": [topic, style],
+            "topic": topic,
+            "style": style,
             "length": length,
             "target_word_count": self._get_length_instruction(length)[0],
-            "code_examples": []  # TODO: Extract code examples if present
+            "code_examples": extract_code_blocks(main_content)
         }
+        if sections is not None:
+            assembled["sections"] = [{"name": section, "content": sections[section]} for section in SECTIONS]
+            assembled["context_hash"] = self._store_context(context)
+            if not self.section_cache.enabled:
+                assembled["context"] = context
+        return assembled
+
+    def _generate_content(self, topic: str, search_results: List[Dict], style: str, length: str = "medium") -> Dict:
+        """Generate content using OpenAI based on search results."""
+        model_config = self._get_model_config(length)
+        context = self._build_context(topic, search_results, length, model_config)
+        if length != "very_long":
+            content = self._generate_content_in_chunks(topic, context, style, length, model_config=model_config)
+            return self._assemble_content(topic, content, style, length)
+
+        title, parts = self._generate_sections(topic, context, style, length, model_config=model_config)
+        return self._assemble_content(topic, self._join_sections(title, parts), style, length, parts, context)
+
+    def regenerate_sections(self, content: Dict, sections: Optional[List[str]] = None,
+                            regenerate_title: bool = False) -> Dict:
+        """
+        Regenerate selected sections and/or the title of a very long article.
+
+        The other sections and the search context are reused from the section cache,
+        so regenerating one section costs one completion and no search. The new
+        versions replace the cached ones, and the finished-article cache is updated.
+
+        Args:
+            content (Dict): An article returned by generate_blog_post with length "very_long"
+            sections (List[str]): Names of the sections to regenerate (see SECTIONS)
+            regenerate_title (bool): Whether to generate a new title
+        """
+        sections = list(sections or [])
+        unknown = [section for section in sections if section not in SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown section: {unknown[0]}")
+        if "sections" not in content or "context_hash" not in content:
+            raise ValueError("Only very_long articles can be regenerated section by section")
+
+        context = content.get("context") or self.section_cache.get(
+            DiskCache.make_key("context", content["context_hash"])
+        )
+        if context is None:
+            raise ValueError("The context of this article is no longer cached; generate it again")
+
+        topic, style, length = content["topic"], content["style"], content["length"]
+        with start_trace("regenerate_sections") as trace:
+            title, regenerated = self._generate_sections(
+                topic, context, style, length, sections=sections, title=regenerate_title, use_cache=False
+            )
+            parts = {section["name"]: section["content"] for section in content["sections"]}
+            parts.update(regenerated)
+            updated = self._assemble_content(
+                topic, self._join_sections(title or content["title"], parts), style, length, parts, context
+            )
+        updated = self._attach_trace(updated, trace)
+        self.result_cache.set(("blog_post", topic, style, length), updated)
+        return updated
+
+    def _search_for_topic(self, topic: str, style: str) -> List:
+        """Find recent content for a topic, pipelined or sequentially."""
+        if self.pipelined:
+            # Overlap query rewriting with a speculative search on the raw topic
+            return self._pipelined_search(topic, style)
+
+        # Generate optimized search query
+        search_query = self._generate_search_query(topic, style)
+
+        # Search for recent content
+        return self._search_recent_content(search_query)
 
     def generate_blog_post(self, topic: str, style: str = "technical", length: str = "medium") -> Dict:
         """
@@ -224,43 +792,206 @@ Use appropriate section breaks and formatting for better readability.
             topic (str): The main topic of the blog post
             style (str): The writing style ("Technical", "Tutorial", "Overview", "Deep Dive")
             length (str): Desired length of the article ("short", "medium", "long", "very_long")
+
+        Finished articles are cached per (topic, style, length), and concurrent identical
+        requests share one generation. The per-stage trace (timings, token usage, cache
+        hits) is attached under content["metadata"]["trace"].
         """
-        # Generate optimized search query
-        search_query = self._generate_search_query(topic, style)
-        
-        # Search for recent content
-        search_results = self._search_recent_content(search_query)
-        
-        # Generate the blog post
-        return self._generate_content(topic, search_results, style, length)
+        return self.result_cache.get_or_generate(
+            ("blog_post", topic, style, length),
+            lambda: self._generate_blog_post(topic, style, length)
+        )
+
+    def _generate_blog_post(self, topic: str, style: str, length: str) -> Dict:
+        """Run the full search and generation pipeline for a blog post."""
+        with start_trace("blog_post") as trace:
+            search_results = self._search_for_topic(topic, style)
+
+            # Generate the blog post
+            content = self._generate_content(topic, search_results, style, length)
+        return self._attach_trace(content, trace)
+
+    def _attach_trace(self, content: Dict, trace) -> Dict:
+        """Store the trace summary in the content metadata."""
+        content.setdefault("metadata", {})["trace"] = trace.to_dict()
+        return content
+
+    def _stream_single_chunk(self, topic: str, context: str, style: str, length: str,
+                             model_config: Dict) -> Iterator[Dict]:
+        """Stream a shorter article, splitting the first line off as the title."""
+        _, length_instruction = self._get_length_instruction(length)
+        request = self._single_chunk_request(topic, context, style, length_instruction, model_config)
+
+        text = ""
+        title_done = False
+        for delta in self._stream_completion(request, stage="single_chunk"):
+            text += delta
+            if title_done:
+                yield {"type": "content", "text": delta}
+            elif "\n" in text:
+                title_done = True
+                first_line, rest = text.split("\n", 1)
+                yield {"type": "title", "text": first_line.replace("# ", "").strip()}
+                if rest:
+                    yield {"type": "content", "text": rest}
+
+        if not title_done:
+            yield {"type": "title", "text": text.replace("# ", "").strip()}
+        yield {"type": "done", "content": self._assemble_content(topic, text, style, length)}
+
+    def _stream_sections(self, topic: str, context: str, style: str, length: str,
+                         model_config: Dict) -> Iterator[Dict]:
+        """
+        Stream a very long article section by section.
+
+        The title and first section stream token by token while the remaining
+        sections are generated concurrently and emitted in order as they finish.
+        """
+        word_count, _ = self._get_length_instruction(length)
+        workers = max(1, min(self.max_section_workers, len(SECTIONS) - 1))
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="section")
+        try:
+            background = self._submit_sections(executor, topic, context, style, length, model_config, SECTIONS[1:])
+            pending = list(background.values())
+
+            title = ""
+            title_key = self._section_key(topic, style, "title", context, model_config)
+            for delta in self._stream_section(title_key, self._title_request(topic, style, model_config), "title"):
+                title += delta
+                yield {"type": "title", "text": delta}
+            parts = {}
+
+            section_word_count = word_count // len(SECTIONS)
+            first_request = self._section_request(
+                topic, context, style, SECTIONS[0], 0, len(SECTIONS), section_word_count, model_config
+            )
+            first_key = self._section_key(topic, style, SECTIONS[0], context, model_config, section_word_count)
+            yield {"type": "section", "name": SECTIONS[0]}
+            part = ""
+            for delta in self._stream_section(first_key, first_request, "section", section=SECTIONS[0]):
+                part += delta
+                yield {"type": "content", "text": delta}
+            parts[SECTIONS[0]] = part
+
+            for section in SECTIONS[1:]:
+                part = self._section_result(background[section], section, pending)
+                parts[section] = part
+                yield {"type": "section", "name": section}
+                yield {"type": "content", "text": "\n\n" + part}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        content = self._join_sections(title.strip(), parts)
+        yield {"type": "done", "content": self._assemble_content(topic, content, style, length, parts, context)}
+
+    def stream_blog_post(self, topic: str, style: str = "technical", length: str = "medium") -> Iterator[Dict]:
+        """
+        Generate a blog post, yielding events as tokens arrive.
+
+        Events are dicts with a "type" key:
+            "title" / "content": a text delta in "text"
+            "section": a very_long section is starting, its name in "name"
+            "code": a fenced code block finished streaming, as a code example dict in "example"
+            "done": the finished content dict (as returned by generate_blog_post) in "content"
+
+        A cached article is replayed immediately as a title, a content and a done event.
+        Concurrent identical requests, streamed or not, share one generation: the
+        others wait for it to finish and then replay its article the same way.
+        """
+        cache_parts = ("blog_post", topic, style, length)
+        cached = self.result_cache.get(cache_parts)
+        if cached is not None:
+            yield from self._replay(cached)
+            return
+
+        key = self.result_cache.key(cache_parts)
+        flights = self.result_cache.flights
+        call, leader = flights.begin(key)
+        if not leader:
+            shared = copy.deepcopy(flights.wait(call))
+            shared.setdefault("metadata", {})["result_cache"] = "shared"
+            yield from self._replay(shared)
+            return
+
+        published = False
+        try:
+            with start_trace("blog_post") as trace:
+                search_results = self._search_for_topic(topic, style)
+                model_config = self._get_model_config(length)
+                context = self._build_context(topic, search_results, length, model_config)
+
+                if length == "very_long":
+                    events = self._stream_sections(topic, context, style, length, model_config)
+                else:
+                    events = self._stream_single_chunk(topic, context, style, length, model_config)
+
+                for event in self._with_code_events(events):
+                    if event["type"] == "done":
+                        self._attach_trace(event["content"], trace)
+                        self.result_cache.set(cache_parts, event["content"])
+                        # Waiting requests get their own copy; the caller may modify this one
+                        flights.finish(key, call, result=copy.deepcopy(event["content"]))
+                        published = True
+                    yield event
+        except BaseException as e:
+            if not published:
+                # A consumer that stops early closes the generator; waiting requests must not see GeneratorExit
+                error = RuntimeError("The shared generation was abandoned") if isinstance(e, GeneratorExit) else e
+                flights.finish(key, call, error=error)
+                published = True
+            raise
+        finally:
+            if not published:
+                flights.finish(key, call, error=RuntimeError("The generation finished without a result"))
+
+    def _replay(self, content: Dict) -> Iterator[Dict]:
+        """Emit a finished article as a title, a content and a done event."""
+        events = iter([
+            {"type": "title", "text": content["title"]},
+            {"type": "content", "text": content["content"]},
+            {"type": "done", "content": content}
+        ])
+        yield from self._with_code_events(events)
+
+    def _with_code_events(self, events: Iterator[Dict]) -> Iterator[Dict]:
+        """Pass events through, adding a "code" event as each fenced code block completes."""
+        parser = FenceParser()
+        for event in events:
+            if event["type"] == "content":
+                yield event
+                for example in parser.feed(event["text"]):
+                    yield {"type": "code", "example": example}
+                continue
+            if event["type"] == "done":
+                for example in parser.close():
+                    yield {"type": "code", "example": example}
+            yield event
 
     def generate_tutorial(self, topic: str, difficulty: str = "intermediate") -> Dict:
         """Generate a step-by-step tutorial with code examples."""
         return self.generate_blog_post(topic, style="Tutorial")
 
+    def stream_tutorial(self, topic: str, difficulty: str = "intermediate") -> Iterator[Dict]:
+        """Stream a step-by-step tutorial; see stream_blog_post for the events."""
+        return self.stream_blog_post(topic, style="Tutorial")
+
     def track_tech_trends(self, technology: str) -> List[Dict]:
         """Track recent developments and trends for a specific technology."""
         search_results = self._search_recent_content(f"latest developments in {technology}")
-        return [{"title": r.title, "url": r.url, "summary": r.text[:200]} for r in search_results]
+        return [{"title": r.title, "url": r.url, "summary": (r.text or "")[:200]} for r in search_results]
 
     def generate_code_examples(self, topic: str, language: str) -> List[Dict]:
         """Generate relevant code examples for a given topic."""
         search_query = f"{topic} code examples in {language}"
         search_results = self._search_recent_content(search_query)
         
-        # Extract code blocks from search results
+        # Extract fenced code blocks from search results, dropping repeats across results
         code_examples = []
         for result in search_results:
-            if "```" in result.text:
-                code_blocks = result.text.split("```")
-                for i in range(1, len(code_blocks), 2):
-                    code_examples.append({
-                        "language": language,
-                        "code": code_blocks[i].strip(),
-                        "source": result.url
-                    })
-        
-        return code_examples
+            code_examples.extend(extract_code_blocks(result.text or "", default_language=language, source=result.url))
+
+        return dedupe_code_blocks(code_examples)
 
     def format_content(self, content: Dict, output_format: str = "markdown") -> str:
         """
@@ -0,0 +1,149 @@
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Opening fence: indentation, 3+ backticks or tildes, then an optional info string
+FENCE_PATTERN = re.compile(r"^(?P<indent>[ \t]*)(?P<fence>`{3,}|~{3,})(?P<info>.*)$")
+
+
+def _opening_fence(line: str) -> Optional[Dict]:
+    """Return the fence details if the line opens a fenced code block."""
+    match = FENCE_PATTERN.match(line)
+    if match is None:
+        return None
+    fence, info = match.group("fence"), match.group("info").strip()
+    # Backtick fences cannot have backticks in their info string (that is inline code)
+    if fence[0] == "`" and "`" in info:
+        return None
+    return {
+        "char": fence[0],
+        "length": len(fence),
+        "indent": len(match.group("indent")),
+        "language": info.split()[0].lstrip("{.").rstrip("}") if info else ""
+    }
+
+
+def _closes(line: str, fence: Dict) -> bool:
+    """A closing fence uses the same character, is at least as long and has nothing after it."""
+    stripped = line.strip()
+    return (
+        len(stripped) >= fence["length"]
+        and stripped == fence["char"] * len(stripped)
+    )
+
+
+def _dedent(line: str, indent: int) -> str:
+    """Remove up to `indent` leading whitespace characters, as the fence itself was indented."""
+    index = 0
+    while index < indent and index < len(line) and line[index] in " \t":
+        index += 1
+    return line[index:]
+
+
+def code_fingerprint(code: str) -> str:
+    """Identity of a snippet for deduplication, ignoring trailing whitespace."""
+    normalized = "\n".join(line.rstrip() for line in code.strip("\n").split("\n"))
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class FenceParser:
+    """
+    Single-pass fenced code block parser that accepts input in arbitrary pieces.
+
+    feed() takes the next piece of text (a whole document or one streamed token) and
+    returns the blocks completed by it; close() flushes the last line and any block
+    left open at the end of the input. Backtick and tilde fences, info strings,
+    indented fences and longer outer fences that contain shorter inner ones are
+    handled. Identical snippets are only reported once when dedupe is set.
+    """
+
+    def __init__(self, default_language: str = "", source: Optional[str] = None, dedupe: bool = True):
+        self.default_language = default_language
+        self.source = source
+        self.dedupe = dedupe
+        self._seen = set()
+        self._partial = ""
+        self._fence = None
+        self._lines = []
+
+    def feed(self, text: str) -> List[Dict]:
+        """Consume the next piece of text and return any code blocks it completed."""
+        blocks = []
+        start = 0
+        while True:
+            newline = text.find("\n", start)
+            if newline == -1:
+                break
+            line = self._partial + text[start:newline]
+            self._partial = ""
+            self._process_line(line.rstrip("\r"), blocks)
+            start = newline + 1
+        self._partial += text[start:]
+        return blocks
+
+    def close(self) -> List[Dict]:
+        """Finish the input; a block still open at the end runs to the end of the text."""
+        blocks = []
+        if self._partial:
+            line, self._partial = self._partial, ""
+            self._process_line(line, blocks)
+        if self._fence is not None:
+            self._emit(blocks)
+        return blocks
+
+    def _process_line(self, line: str, blocks: List[Dict]) -> None:
+        if self._fence is None:
+            self._fence = _opening_fence(line)
+            self._lines = []
+        elif _closes(line, self._fence):
+            self._emit(blocks)
+        else:
+            self._lines.append(_dedent(line, self._fence["indent"]))
+
+    def _emit(self, blocks: List[Dict]) -> None:
+        code = "\n".join(self._lines)
+        language = self._fence["language"] or self.default_language
+        self._fence = None
+        self._lines = []
+        if not code.strip():
+            return
+        if self.dedupe:
+            fingerprint = code_fingerprint(code)
+            if fingerprint in self._seen:
+                return
+            self._seen.add(fingerprint)
+        block = {"language": language, "code": code}
+        if self.source is not None:
+            block["source"] = self.source
+        blocks.append(block)
+
+
+def extract_code_blocks(text: str, default_language: str = "", source: Optional[str] = None) -> List[Dict]:
+    """Extract deduplicated fenced code blocks from a complete text."""
+    parser = FenceParser(default_language=default_language, source=source)
+    return parser.feed(text or "") + parser.close()
+
+
+def dedupe_code_blocks(blocks: Iterable[Dict]) -> List[Dict]:
+    """Drop blocks whose code matches an earlier block."""
+    seen, unique = set(), []
+    for block in blocks:
+        fingerprint = code_fingerprint(block.get("code", ""))
+        if fingerprint not in seen:
+            seen.add(fingerprint)
+            unique.append(block)
+    return unique
+
+
+def strip_code_blocks(text: str) -> str:
+    """Remove fenced code blocks (including their fences) from markdown text."""
+    kept, fence = [], None
+    for line in (text or "").split("\n"):
+        if fence is None:
+            fence = _opening_fence(line)
+            if fence is None:
+                kept.append(line)
+        elif _closes(line, fence):
+            fence = None
+    # Collapse the blank lines left where blocks were removed
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
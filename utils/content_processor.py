@@ -1,53 +1,234 @@
-import markdown
+import hashlib
 import json
-from typing import Dict, List
-from bs4 import BeautifulSoup
-import frontmatter
+import queue
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from utils.code_extractor import code_fingerprint, extract_code_blocks
+from utils.tracing import span
+
+# Content fields that affect the markdown, HTML and front-matter renderings
+DOCUMENT_FIELDS = ["title", "date", "content", "code_examples", "tags"]
+
+# Metadata fields written to the front-matter header
+FRONTMATTER_FIELDS = ["generated_at", "generator", "version", "type"]
+
+# Trend report sections: (report key, heading, item formatter)
+TREND_SECTIONS = [
+    ("trends", "Hacker News", lambda item: f"{item.get('points', 0)} points, {item.get('comments', 0)} comments"),
+    ("github_activity", "GitHub Repositories",
+     lambda item: f"{item.get('stars', 0)} stars" + (f": {item['description']}" if item.get("description") else "")),
+    ("blog_posts", "Blog Posts", lambda item: f"by {item['author']}" if item.get("author") else ""),
+    ("research", "Research", lambda item: ", ".join(item.get("authors") or []))
+]
+
+
+def trend_report_markdown(report: Dict) -> str:
+    """Markdown body of a trend report: a linked list of items per source."""
+    md = ""
+    for key, heading, describe in TREND_SECTIONS:
+        items = report.get(key) or []
+        if not items:
+            continue
+        md += f"## {heading}\n\n"
+        for item in items:
+            details = describe(item)
+            md += f"- [{item.get('title') or item.get('name')}]({item.get('url')})"
+            md += f" ({details})\n" if details else "\n"
+        md += "\n"
+    unavailable = [name for name, source in (report.get("sources") or {}).items() if source.get("status") != "ok"]
+    if unavailable:
+        md += f"*Unavailable sources: {', '.join(unavailable)}*\n"
+    return md or "No recent activity found.\n"
+
 
 class ContentProcessor:
-    def __init__(self):
-        self.supported_formats = ["markdown", "html", "json"]
+    def __init__(self, cache_size: int = 256):
+        self.supported_formats = ["markdown", "html", "json", "frontmatter"]
+        self.cache_size = cache_size
+        self._markdown_pool = queue.LifoQueue()
+        self._rendered = OrderedDict()
+        self._lock = threading.Lock()
 
     def process_content(self, content: Dict, output_format: str = "markdown") -> str:
         """
         Process and format the content in the specified format.
+
+        The content is not modified; the formatting span goes to the current trace
+        (if any) and the global metrics.
         """
         if output_format not in self.supported_formats:
             raise ValueError(f"Unsupported format: {output_format}")
 
-        if output_format == "markdown":
-            return self._to_markdown(content)
-        elif output_format == "html":
-            return self._to_html(content)
-        else:
-            return json.dumps(content, indent=2)
+        with span("process_content", format=output_format):
+            return self.render(content, [output_format])[output_format]
 
-    def _to_markdown(self, content: Dict) -> str:
+    def render(self, content: Dict, formats: Optional[List[str]] = None) -> Dict[str, str]:
         """
-        Convert content to markdown format.
+        Render the content in several formats in one pass.
+
+        The markdown document is assembled once and shared by the markdown, HTML and
+        front-matter outputs; HTML conversion reuses pooled markdown.Markdown instances.
+        Outputs are memoized by a hash of the fields each format depends on. Trend
+        reports are rendered from their document (see to_document).
         """
-        md = f"# {content.get('title', 'Untitled')}\n\n"
-        md += f"*Generated on {content.get('date', '')}*\n\n"
-        
+        formats = formats or self.supported_formats
+        unsupported = [output_format for output_format in formats if output_format not in self.supported_formats]
+        if unsupported:
+            raise ValueError(f"Unsupported format: {unsupported[0]}")
+
+        # JSON keeps the content as it is; the other formats render its document
+        article = self.to_document(content)
+        keys = self._cache_keys(content, article, formats)
+
+        outputs = {}
+        with self._lock:
+            for output_format in formats:
+                if keys[output_format] in self._rendered:
+                    self._rendered.move_to_end(keys[output_format])
+                    outputs[output_format] = self._rendered[keys[output_format]]
+
+        missing = [output_format for output_format in formats if output_format not in outputs]
+        if missing:
+            document = None
+            if any(output_format != "json" for output_format in missing):
+                document = self._markdown_body(article)
+
+            for output_format in missing:
+                if output_format == "markdown":
+                    outputs[output_format] = self._markdown_document(article, document)
+                elif output_format == "html":
+                    outputs[output_format] = self.markdown_to_html(self._markdown_document(article, document))
+                elif output_format == "frontmatter":
+                    outputs[output_format] = self._to_frontmatter(article, document)
+                else:
+                    outputs[output_format] = json.dumps(content, indent=2)
+
+            with self._lock:
+                for output_format in missing:
+                    self._rendered[keys[output_format]] = outputs[output_format]
+                while len(self._rendered) > self.cache_size:
+                    self._rendered.popitem(last=False)
+
+        return {output_format: outputs[output_format] for output_format in formats}
+
+    def _cache_keys(self, content: Dict, article: Dict, formats: List[str]) -> Dict[str, tuple]:
+        """Memo keys for the requested formats; only the fields each one depends on are hashed."""
+        keys = {}
+        document_hash = None
+        for output_format in formats:
+            if output_format == "json":
+                # JSON is the only output that depends on the whole dict, trace included
+                keys[output_format] = ("json", self._content_hash(content))
+                continue
+            if document_hash is None:
+                document_hash = self._content_hash({field: article.get(field) for field in DOCUMENT_FIELDS})
+            if output_format == "frontmatter":
+                keys[output_format] = ("frontmatter", document_hash, self._content_hash(
+                    {field: article.get("metadata", {}).get(field) for field in FRONTMATTER_FIELDS}
+                ))
+            else:
+                keys[output_format] = (output_format, document_hash)
+        return keys
+
+    @staticmethod
+    def to_document(content: Dict) -> Dict:
+        """
+        The document the markdown, HTML and front-matter outputs are rendered from.
+
+        Articles are their own document. Trend reports have no body or title; they
+        become a titled document listing each source's items.
+        """
+        if "content" in content or "technology" not in content:
+            return content
+        return {
+            "title": f"{content['technology']} Trend Report",
+            "date": content.get("date"),
+            "content": trend_report_markdown(content),
+            "tags": [content["technology"], "trends"],
+            "metadata": content.get("metadata", {})
+        }
+
+    @staticmethod
+    def _content_hash(value) -> str:
+        return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _markdown_body(self, content: Dict) -> str:
+        """
+        Assemble the article body: the content followed by any code examples.
+
+        Examples that already appear as fenced blocks in the content are not repeated.
+        """
+        md = ""
         if 'content' in content:
             md += content['content'] + "\n\n"
-            
-        if 'code_examples' in content and content['code_examples']:
+
+        inline = {code_fingerprint(block["code"]) for block in extract_code_blocks(content.get('content', ''))}
+        examples = [
+            example for example in content.get('code_examples') or []
+            if code_fingerprint(example.get('code', '')) not in inline
+        ]
+        if examples:
             md += "## Code Examples\n\n"
-            for example in content['code_examples']:
+            for example in examples:
                 md += f"```{example.get('language', '')}\n{example.get('code', '')}\n```\n\n"
+        return md
+
+    def _markdown_document(self, content: Dict, body: str) -> str:
+        """
+        Wrap the body with the title, date and tags.
+        """
+        md = f"# {content.get('title', 'Untitled')}\n\n"
+        md += f"*Generated on {content.get('date', '')}*\n\n"
+        md += body
                 
         if 'tags' in content and content['tags']:
             md += "**Tags:** " + ", ".join(content['tags'])
             
         return md
 
+    def _to_markdown(self, content: Dict) -> str:
+        """
+        Convert content to markdown format.
+        """
+        return self.render(content, ["markdown"])["markdown"]
+
+    def markdown_to_html(self, md_content: str) -> str:
+        """
+        Convert markdown to HTML with a pooled parser.
+        """
+        try:
+            parser = self._markdown_pool.get_nowait()
+        except queue.Empty:
+            import markdown
+            parser = markdown.Markdown()
+        try:
+            return parser.convert(md_content)
+        finally:
+            parser.reset()
+            self._markdown_pool.put(parser)
+
     def _to_html(self, content: Dict) -> str:
         """
         Convert content to HTML format.
         """
-        md_content = self._to_markdown(content)
-        return markdown.markdown(md_content)
+        return self.render(content, ["html"])["html"]
+
+    def _to_frontmatter(self, content: Dict, body: str) -> str:
+        """
+        Convert content to markdown with a YAML front-matter header, for static site generators.
+        """
+        import frontmatter
+
+        metadata = {
+            "title": content.get("title", "Untitled"),
+            "date": content.get("date", ""),
+            "tags": list(content.get("tags") or [])
+        }
+        for field in FRONTMATTER_FIELDS:
+            if content.get("metadata", {}).get(field):
+                metadata[field] = content["metadata"][field]
+        return frontmatter.dumps(frontmatter.Post(body.rstrip() + "\n", **metadata))
 
     def add_metadata(self, content: Dict) -> Dict:
         """
@@ -59,7 +240,8 @@ class ContentProcessor:
             "version": "1.0",
             "type": content.get("type", "blog_post")
         }
-        content["metadata"] = metadata
+        # Keep anything the generator already recorded (such as the trace)
+        content["metadata"] = {**content.get("metadata", {}), **metadata}
         return content
 
     def validate_content(self, content: Dict) -> bool:
@@ -67,4 +249,4 @@ class ContentProcessor:
         Validate the content structure and required fields.
         """
         required_fields = ["title", "content"]
-        return all(field in content for field in required_fields) 
\ No newline at end of file
+        return all(field in content for field in required_fields)
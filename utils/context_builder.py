@@ -0,0 +1,150 @@
+import hashlib
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Set
+
+from utils.tokens import estimate_tokens
+
+# Words of each result used for near-duplicate detection; copies diverge early if at all
+SIGNATURE_WORDS = 2000
+
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "were", "has", "have",
+    "you", "your", "its", "into", "about", "how", "what", "when", "why", "can", "will", "not",
+    "but", "our", "their", "they", "them", "which", "also", "more", "than", "use", "using"
+}
+
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used for shingling and scoring."""
+    return WORD_PATTERN.findall(text.lower())
+
+
+class ContextBuilder:
+    """
+    Build prompt context from search results within a token budget.
+
+    Near-duplicate results (syndicated copies of one article) are removed with
+    bottom-k MinHash sketches over word shingles. The remaining text is split into passages, ranked
+    against the topic with a BM25-style score, and the best passages are packed
+    until the token budget is reached.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.8, sketch_size: int = 64, shingle_size: int = 5,
+                 passage_words: int = 120):
+        self.similarity_threshold = similarity_threshold
+        self.sketch_size = sketch_size
+        self.shingle_size = shingle_size
+        self.passage_words = passage_words
+
+    def _shingles(self, text: str) -> Set[int]:
+        words = tokenize(text)[:SIGNATURE_WORDS]
+        if len(words) <= self.shingle_size:
+            windows = [words]
+        else:
+            windows = [words[i:i + self.shingle_size] for i in range(len(words) - self.shingle_size + 1)]
+        return {
+            int.from_bytes(hashlib.blake2b(" ".join(shingle).encode("utf-8"), digest_size=8).digest(), "big")
+            for shingle in windows if shingle
+        }
+
+    def signature(self, text: str) -> Set[int]:
+        """Bottom-k MinHash sketch: the sketch_size smallest shingle hashes."""
+        return set(heapq.nsmallest(self.sketch_size, self._shingles(text)))
+
+    def similarity(self, first: Set[int], second: Set[int]) -> float:
+        """Estimated Jaccard similarity of two sketches."""
+        union = heapq.nsmallest(self.sketch_size, first | second)
+        if not union:
+            return 1.0
+        return sum(1 for value in union if value in first and value in second) / len(union)
+
+    def deduplicate(self, results: List) -> List:
+        """Drop results whose text is a near duplicate of an earlier result."""
+        kept, signatures = [], []
+        for result in results:
+            text = getattr(result, "text", None) or ""
+            signature = self.signature(text)
+            if any(self.similarity(signature, other) >= self.similarity_threshold for other in signatures):
+                continue
+            kept.append(result)
+            signatures.append(signature)
+        return kept
+
+    def _passages(self, text: str) -> List[str]:
+        """Split text on paragraphs, merging them into passages of about passage_words words."""
+        passages, current, count = [], [], 0
+        for paragraph in re.split(r"\n\s*\n", text):
+            words = paragraph.split()
+            if not words:
+                continue
+            # Break overly long paragraphs into passage-sized pieces
+            for start in range(0, len(words), self.passage_words):
+                piece = words[start:start + self.passage_words]
+                if count and count + len(piece) > self.passage_words:
+                    passages.append(" ".join(current))
+                    current, count = [], 0
+                current.extend(piece)
+                count += len(piece)
+        if current:
+            passages.append(" ".join(current))
+        return passages
+
+    def _rank(self, topic: str, candidates: List[Dict]) -> List[Dict]:
+        """Score passages against the topic (BM25 with a small bonus for higher-ranked results)."""
+        terms = [term for term in tokenize(topic) if term not in STOPWORDS] or tokenize(topic)
+        documents = [Counter(tokenize(candidate["text"])) for candidate in candidates]
+        average_length = sum(sum(doc.values()) for doc in documents) / max(1, len(documents))
+        idf = {}
+        for term in set(terms):
+            containing = sum(1 for doc in documents if term in doc)
+            idf[term] = math.log(1 + (len(documents) - containing + 0.5) / (containing + 0.5))
+
+        for candidate, doc in zip(candidates, documents):
+            length = sum(doc.values())
+            score = 0.0
+            for term in idf:
+                frequency = doc.get(term, 0)
+                if not frequency:
+                    continue
+                score += idf[term] * frequency * 2.2 / (frequency + 1.2 * (0.25 + 0.75 * length / max(1.0, average_length)))
+            if set(terms) & set(tokenize(candidate["title"])):
+                score += 0.5
+            candidate["score"] = score + 1.0 / (1 + candidate["rank"] + candidate["position"] * 0.1)
+        return sorted(candidates, key=lambda candidate: candidate["score"], reverse=True)
+
+    def build(self, topic: str, results: List, token_budget: int) -> str:
+        """Build the context string for the topic, packing the best passages within token_budget."""
+        results = self.deduplicate(results)
+        candidates = []
+        for rank, result in enumerate(results):
+            title = getattr(result, "title", None) or "Untitled"
+            for position, passage in enumerate(self._passages(getattr(result, "text", None) or "")):
+                candidates.append({"rank": rank, "position": position, "title": title, "text": passage})
+
+        selected, sources, used = [], set(), 0
+        for candidate in self._rank(topic, candidates):
+            cost = estimate_tokens(candidate["text"])
+            if candidate["rank"] not in sources:
+                # Each new source adds a "Title: ... Content:" header
+                cost += estimate_tokens(candidate["title"]) + 4
+            if used + cost > token_budget:
+                continue
+            selected.append(candidate)
+            sources.add(candidate["rank"])
+            used += cost
+
+        # Present passages grouped by source, in the original order
+        grouped = {}
+        for candidate in sorted(selected, key=lambda c: (c["rank"], c["position"])):
+            grouped.setdefault(candidate["rank"], {"title": candidate["title"], "passages": []})
+            grouped[candidate["rank"]]["passages"].append(candidate["text"])
+
+        return "\n\n".join(
+            f"Title: {source['title']}\nContent: " + " ... ".join(source["passages"])
+            for source in grouped.values()
+        )
@@ -0,0 +1,235 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils.cache import DEFAULT_CACHE_PATH
+
+# Job lifecycle: queued -> running -> done | failed; jobs left unfinished by a restart become interrupted
+JOB_STATUSES = ["queued", "running", "done", "failed", "interrupted"]
+
+FINISHED_STATUSES = ("done", "failed", "interrupted")
+
+JOB_FIELDS = ["id", "kind", "params", "status", "progress", "stage", "preview", "result", "error",
+              "owner", "created_at", "updated_at"]
+
+# Fields stored as JSON text
+JSON_FIELDS = ("params", "result")
+
+
+def owner_alive(owner: str) -> Optional[bool]:
+    """
+    Whether the process that owns a job ("host:pid:runner") is still running.
+
+    Returns None when that cannot be told from here, i.e. the owner is on another host.
+    """
+    host, _, rest = owner.partition(":")
+    pid = rest.partition(":")[0]
+    if host != socket.gethostname() or not pid.isdigit():
+        return None
+    if int(pid) == os.getpid():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobStore:
+    """
+    SQLite-backed store of job records keyed by job ID.
+
+    Uses the cache database file by default. Finished jobs are kept for `ttl` seconds.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 24 * 3600):
+        self.path = path or os.getenv("CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                stage TEXT,
+                preview TEXT,
+                result TEXT,
+                error TEXT,
+                owner TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (status, updated_at)")
+        conn.commit()
+        return conn
+
+    def save(self, job: Dict) -> None:
+        """Insert or replace a job record."""
+        row = [json.dumps(job[field], default=str) if field in JSON_FIELDS else job[field] for field in JOB_FIELDS]
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(JOB_FIELDS)}) VALUES ({', '.join('?' * len(JOB_FIELDS))})",
+                row
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return the job record, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(JOB_FIELDS, row))
+        for field in JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] is not None else None
+        return job
+
+    def mark_interrupted(self, stale_after: float = 3600) -> int:
+        """
+        Mark unfinished jobs whose owner stopped as interrupted; returns how many.
+
+        Jobs of processes on this host that no longer exist are interrupted at once.
+        Other processes sharing the store keep their jobs; jobs of other hosts are
+        only interrupted once they have not been updated for stale_after seconds.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, owner, updated_at FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+            stale = [
+                job_id for job_id, owner, updated_at in rows
+                if owner is None or owner_alive(owner) is False
+                or (owner_alive(owner) is None and now - updated_at > stale_after)
+            ]
+            self._conn.executemany(
+                """UPDATE jobs SET status = 'interrupted', error = 'Interrupted by a restart', updated_at = ?
+                   WHERE id = ? AND status IN ('queued', 'running')""",
+                [(now, job_id) for job_id in stale]
+            )
+            self._conn.commit()
+        return len(stale)
+
+    def prune(self) -> int:
+        """Delete finished jobs older than the TTL; returns how many."""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED_STATUSES))}) AND updated_at < ?",
+                (*FINISHED_STATUSES, time.time() - self.ttl)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+
+class JobRunner:
+    """
+    Runs jobs on a background worker pool and tracks them in a JobStore.
+
+    A job is a function taking a report(stage=None, progress=None, preview=None)
+    callback and returning a JSON-serializable result. Progress is kept in memory
+    and written to the store at most every `flush_interval` seconds, so token-level
+    preview updates stay cheap; the final state is always written.
+
+    The store outlives the process, but job functions do not. Each job records
+    its owner (host, process and runner), and a starting runner marks the jobs of
+    processes that have stopped as interrupted (see JobStore.mark_interrupted).
+    Several processes or replicas can share one store.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, workers: int = 2, flush_interval: float = 0.5,
+                 stale_after: float = 3600):
+        self.store = store or JobStore()
+        self.flush_interval = flush_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._live = {}
+        self._flushed = {}
+        self._lock = threading.Lock()
+
+        self.store.mark_interrupted(stale_after)
+        self.store.prune()
+
+    def submit(self, fn: Callable[[Callable], Any], kind: str = "generation", params: Optional[Dict] = None) -> str:
+        """Queue a job and return its ID."""
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "params": params or {},
+            "status": "queued",
+            "progress": 0.0,
+            "stage": None,
+            "preview": None,
+            "result": None,
+            "error": None,
+            "owner": self.owner,
+            "created_at": now,
+            "updated_at": now
+        }
+        with self._lock:
+            self._live[job["id"]] = job
+            self._flushed[job["id"]] = now
+        self.store.save(job)
+        self.executor.submit(self._run, job["id"], fn)
+        return job["id"]
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return a snapshot of the job, from memory while it runs and from the store afterwards."""
+        with self._lock:
+            job = self._live.get(job_id)
+            if job is not None:
+                return dict(job)
+        return self.store.get(job_id)
+
+    def _update(self, job_id: str, flush: bool = False, **fields) -> None:
+        with self._lock:
+            job = self._live[job_id]
+            job.update({name: value for name, value in fields.items() if value is not None})
+            job["updated_at"] = time.time()
+            if not flush and job["updated_at"] - self._flushed[job_id] < self.flush_interval:
+                return
+            self._flushed[job_id] = job["updated_at"]
+            snapshot = dict(job)
+        self.store.save(snapshot)
+
+    def _run(self, job_id: str, fn: Callable[[Callable], Any]) -> None:
+        def report(stage: Optional[str] = None, progress: Optional[float] = None, preview: Optional[str] = None):
+            self._update(job_id, stage=stage, progress=progress, preview=preview)
+
+        self._update(job_id, flush=True, status="running")
+        try:
+            result = fn(report)
+        except Exception as e:
+            self._update(job_id, flush=True, status="failed", error=str(e) or type(e).__name__)
+        else:
+            self._update(job_id, flush=True, status="done", progress=1.0, result=result)
+        finally:
+            with self._lock:
+                del self._live[job_id]
+                del self._flushed[job_id]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs; with wait, block until running jobs finish."""
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from utils.rate_limiter import RateLimiter, get_rate_limiter
+
+# Faster model to use when the preferred one is degraded
+DEFAULT_FALLBACKS = {
+    "gpt-4": "gpt-3.5-turbo"
+}
+
+# Largest completion each model can produce; token budgets are capped to it on fallback
+MAX_OUTPUT_TOKENS = {
+    "gpt-3.5-turbo": 4096,
+    "gpt-4": 8192
+}
+
+
+class ModelStats:
+    """Exponentially weighted latency, throughput and failure rate of one model."""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.samples = 0
+        self.latency = None
+        self.tokens_per_second = None
+        self.failure_rate = 0.0
+        self.last_failure = None
+        self.updated_at = None
+
+    def _ewma(self, current: Optional[float], value: float) -> float:
+        return value if current is None else (1 - self.alpha) * current + self.alpha * value
+
+    def record(self, seconds: Optional[float], completion_tokens: Optional[int], failed: bool, now: float) -> None:
+        self.samples += 1
+        self.failure_rate = self._ewma(self.failure_rate, 1.0 if failed else 0.0)
+        self.updated_at = now
+        if failed:
+            self.last_failure = now
+            return
+        self.latency = self._ewma(self.latency, seconds)
+        if completion_tokens and seconds > 0:
+            self.tokens_per_second = self._ewma(self.tokens_per_second, completion_tokens / seconds)
+
+    def to_dict(self) -> Dict:
+        return {
+            "samples": self.samples,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "tokens_per_second": round(self.tokens_per_second, 1) if self.tokens_per_second is not None else None,
+            "failure_rate": round(self.failure_rate, 3)
+        }
+
+
+class ModelRouter:
+    """
+    Picks the model and token budget for each completion from observed performance.
+
+    Every completion attempt is recorded with record(). route() keeps the preferred
+    model unless it is degraded, in which case it switches to the fallback model
+    (capping max_tokens to what that model can produce). A model is degraded when
+    - its failure rate is above failure_threshold (until `cooldown` seconds pass
+      without a failure, after which requests probe it again),
+    - the rate limiter reports it above utilization_threshold of its budget, or
+    - with a latency_slo, max_tokens at its observed throughput would exceed the SLO.
+    Stats older than stale_after seconds are ignored, so a model that was avoided
+    is tried again later. If the fallback would also miss the SLO, max_tokens is
+    reduced to fit it, but never below min_token_fraction of the original budget.
+    """
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None, fallbacks: Optional[Dict] = None,
+                 latency_slo: Optional[float] = None, failure_threshold: float = 0.5,
+                 utilization_threshold: float = 0.9, alpha: float = 0.2, min_samples: int = 3,
+                 cooldown: float = 30.0, stale_after: float = 300.0, min_token_fraction: float = 0.5,
+                 enabled: bool = True):
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.fallbacks = DEFAULT_FALLBACKS if fallbacks is None else fallbacks
+        self.latency_slo = latency_slo
+        self.failure_threshold = failure_threshold
+        self.utilization_threshold = utilization_threshold
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.stale_after = stale_after
+        self.min_token_fraction = min_token_fraction
+        self.enabled = enabled
+        self.routed = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: Optional[float] = None, completion_tokens: Optional[int] = None,
+               failed: bool = False) -> None:
+        """Record the outcome of one completion attempt."""
+        with self._lock:
+            stats = self._stats.setdefault(model, ModelStats(self.alpha))
+            stats.record(seconds, completion_tokens, failed, time.time())
+
+    def _fresh_stats(self, model: str, now: float) -> Optional[ModelStats]:
+        stats = self._stats.get(model)
+        if stats is None or stats.samples < self.min_samples or now - stats.updated_at > self.stale_after:
+            return None
+        return stats
+
+    def predicted_latency(self, model: str, max_tokens: int) -> Optional[float]:
+        """Seconds a completion of max_tokens is expected to take, or None without recent data."""
+        with self._lock:
+            stats = self._fresh_stats(model, time.time())
+            if stats is None or not stats.tokens_per_second:
+                return None
+            return max_tokens / stats.tokens_per_second
+
+    def degraded(self, model: str, max_tokens: int) -> Optional[str]:
+        """Return why the model should be avoided for this request, or None if it is healthy."""
+        now = time.time()
+        with self._lock:
+            stats = self._fresh_stats(model, now)
+            if (stats is not None and stats.failure_rate > self.failure_threshold
+                    and now - stats.last_failure < self.cooldown):
+                return "failures"
+        if self.rate_limiter.utilization(model) >= self.utilization_threshold:
+            return "rate_limit"
+        predicted = self.predicted_latency(model, max_tokens)
+        if self.latency_slo is not None and predicted is not None and predicted > self.latency_slo:
+            return "latency"
+        return None
+
+    def route(self, config: Dict) -> Dict:
+        """Return the model config to use for a request whose preferred config is given."""
+        if not self.enabled:
+            return config
+
+        model, max_tokens = config["model"], config["max_tokens"]
+        reason = self.degraded(model, max_tokens)
+        fallback = self.fallbacks.get(model)
+        if reason is not None and fallback is not None:
+            fallback_tokens = min(max_tokens, MAX_OUTPUT_TOKENS.get(fallback, max_tokens))
+            fallback_reason = self.degraded(fallback, fallback_tokens)
+            # A fallback that is merely slow beats a failing model, but for latency it must be faster
+            usable = fallback_reason in (None, "latency")
+            if usable and reason == "latency":
+                fallback_latency = self.predicted_latency(fallback, fallback_tokens)
+                usable = fallback_latency is None or fallback_latency < self.predicted_latency(model, max_tokens)
+            if usable:
+                config = dict(config, model=fallback, max_tokens=fallback_tokens, routed_from=model, route_reason=reason)
+                with self._lock:
+                    self.routed[(model, fallback, reason)] = self.routed.get((model, fallback, reason), 0) + 1
+
+        predicted = self.predicted_latency(config["model"], config["max_tokens"])
+        if self.latency_slo is not None and predicted is not None and predicted > self.latency_slo:
+            # Even the chosen model would miss the SLO: shrink the budget to fit it
+            budget = int(config["max_tokens"] * self.latency_slo / predicted)
+            budget = max(budget, int(max_tokens * self.min_token_fraction))
+            config = dict(config, max_tokens=min(budget, config["max_tokens"]))
+        return config
+
+    def snapshot(self) -> Dict:
+        """Per-model stats and counts of rerouted requests, for dashboards and benchmarks."""
+        with self._lock:
+            return {
+                "models": {model: stats.to_dict() for model, stats in self._stats.items()},
+                "routed": [
+                    {"from": source, "to": target, "reason": reason, "count": count}
+                    for (source, target, reason), count in self.routed.items()
+                ]
+            }
+
+
+_shared_router = None
+_shared_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """
+    Return the process-wide router shared by every generator, using the shared rate limiter.
+
+    MODEL_LATENCY_SLO sets a latency target in seconds per completion and
+    MODEL_ROUTING_DISABLED=1 always uses the preferred models.
+    """
+    global _shared_router
+    with _shared_lock:
+        if _shared_router is None:
+            _shared_router = ModelRouter(**router_settings())
+        return _shared_router
+
+
+def router_settings() -> Dict:
+    """ModelRouter arguments from the environment."""
+    slo = os.getenv("MODEL_LATENCY_SLO")
+    return {
+        "latency_slo": float(slo) if slo else None,
+        "enabled": os.getenv("MODEL_ROUTING_DISABLED", "").lower() not in ("1", "true", "yes")
+    }
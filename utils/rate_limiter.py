@@ -0,0 +1,222 @@
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+# HTTP statuses worth retrying
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+# Exception class names (openai, httpx, requests) that indicate a transient network failure
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout", "ConnectionError", "Timeout"}
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an API error is transient (rate limiting, overload or a network failure)."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is None:
+        # exa_py reports HTTP failures as "Request failed with status code 429: ..."
+        match = re.search(r"status code (\d{3})", str(error))
+        status = int(match.group(1)) if match else None
+    return status in RETRYABLE_STATUSES or type(error).__name__ in RETRYABLE_ERRORS
+
+
+class TokenBucket:
+    """Token bucket refilled continuously up to its per-minute capacity."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (0 if available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount: float) -> None:
+        """Consume amount; a negative amount refunds."""
+        self.available = min(self.capacity, self.available - min(amount, self.capacity))
+
+    def utilization(self, now: float) -> float:
+        """Fraction of the bucket currently in use."""
+        self._refill(now)
+        return 1.0 - max(0.0, self.available) / self.capacity
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter with per-key request and token budgets.
+
+    Limits are requests ("rpm") and tokens ("tpm") per minute per key; None, or a key
+    that is not configured, means unlimited. Quotas depend on the account's tier, so
+    none are assumed. Keys are model names (or "exa"); a key without limits of its own
+    uses the limits of the longest configured prefix, so "gpt-4-0613" shares the "gpt-4"
+    budget. Calls made through call() wait for budget, then retry transient failures
+    with jittered exponential backoff, honoring Retry-After headers when the server
+    sends them.
+    """
+
+    def __init__(self, limits: Optional[Dict] = None, max_retries: int = 5, base_delay: float = 1.0,
+                 max_delay: float = 60.0):
+        self.limits = limits or {}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _limit_key(self, key: str) -> Optional[str]:
+        matches = [name for name in self.limits if key == name or key.startswith(name + "-")]
+        return max(matches, key=len) if matches else None
+
+    def _get_buckets(self, key: str) -> Dict:
+        limit_key = self._limit_key(key)
+        if limit_key is None:
+            return {}
+        if limit_key not in self._buckets:
+            limit = self.limits[limit_key]
+            self._buckets[limit_key] = {
+                name: TokenBucket(limit[name]) for name in ("rpm", "tpm") if limit.get(name)
+            }
+        return self._buckets[limit_key]
+
+    def reserve(self, key: str, tokens: int = 0) -> float:
+        """
+        Try to take one request and the given tokens from the key's budgets.
+
+        Returns 0 when the budget was taken, otherwise the seconds to wait before
+        trying again (nothing is taken in that case).
+        """
+        amounts = {"rpm": 1, "tpm": tokens}
+        with self._lock:
+            buckets = self._get_buckets(key)
+            now = time.monotonic()
+            delay = max([bucket.wait_time(amounts[name], now) for name, bucket in buckets.items()], default=0.0)
+            if delay == 0.0:
+                for name, bucket in buckets.items():
+                    bucket.take(amounts[name])
+            return delay
+
+    def acquire(self, key: str, tokens: int = 0) -> None:
+        """Block until the key has budget for one request and the given tokens."""
+        while True:
+            delay = self.reserve(key, tokens)
+            if delay == 0.0:
+                return
+            time.sleep(delay)
+
+    def adjust(self, key: str, tokens: int) -> None:
+        """Correct the token budget once actual usage is known (negative refunds)."""
+        with self._lock:
+            bucket = self._get_buckets(key).get("tpm")
+            if bucket is not None:
+                bucket.take(tokens)
+
+    def utilization(self, key: str) -> float:
+        """Highest fraction of the key's request or token budget currently in use."""
+        with self._lock:
+            now = time.monotonic()
+            return max([bucket.utilization(now) for bucket in self._get_buckets(key).values()], default=0.0)
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying after error, or None if it should not be retried."""
+        if not is_retryable(error):
+            return None
+
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+
+        # Full jitter exponential backoff
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            return None
+        if headers.get("retry-after-ms"):
+            try:
+                return float(headers["retry-after-ms"]) / 1000
+            except ValueError:
+                pass
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+
+    def call(self, key: str, fn: Callable, *args, tokens: int = 0, **kwargs):
+        """Call fn under the key's budget, retrying transient failures."""
+        attempt = 0
+        while True:
+            self.acquire(key, tokens)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+
+    async def acquire_async(self, key: str, tokens: int = 0) -> None:
+        """Wait without blocking the event loop until the key has budget."""
+        while True:
+            delay = self.reserve(key, tokens)
+            if delay == 0.0:
+                return
+            await asyncio.sleep(delay)
+
+    async def call_async(self, key: str, fn: Callable, *args, tokens: int = 0, **kwargs):
+        """Await the coroutine function fn under the key's budget, retrying transient failures."""
+        attempt = 0
+        while True:
+            await self.acquire_async(key, tokens)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Return the process-wide limiter shared by every generator.
+
+    Limits are set with the RATE_LIMITS environment variable, a JSON object such as
+    {"gpt-4": {"rpm": 200, "tpm": 40000}}; without it, requests are not throttled.
+    """
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            limits = json.loads(os.getenv("RATE_LIMITS", "{}"))
+            _shared_limiter = RateLimiter(limits, max_retries=int(os.getenv("RATE_LIMIT_MAX_RETRIES", 5)))
+        return _shared_limiter
@@ -0,0 +1,120 @@
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from utils.cache import DiskCache, normalize_text
+from utils.tracing import record_cache
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def begin(self, key: str) -> tuple:
+        """
+        Join the call in flight for key, or start one.
+
+        Returns (call, leader). The leader must end the call with finish(); other
+        callers get its outcome from wait().
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"event": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+        return call, leader
+
+    def finish(self, key: str, call: Dict, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """Publish the leader's result or error and release the waiting callers."""
+        call["result"], call["error"] = result, error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call["event"].set()
+
+    @staticmethod
+    def wait(call: Dict) -> Any:
+        """Wait for a call to finish; returns its result or raises its error."""
+        call["event"].wait()
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"]
+
+    def do(self, key: str, fn: Callable[[], Any]) -> tuple:
+        """
+        Run fn once per key at a time.
+
+        Returns (result, shared) where shared is True when this caller waited on a
+        call started by another thread. Exceptions are raised in every caller.
+        """
+        call, leader = self.begin(key)
+        if leader:
+            try:
+                self.finish(key, call, result=fn())
+            except BaseException as e:
+                self.finish(key, call, error=e)
+        return self.wait(call), not leader
+
+
+class ResultCache:
+    """
+    Cache of finished content dicts with single-flight generation.
+
+    Keys combine the normalized request parameters with a freshness bucket
+    (wall-clock time divided into `freshness`-second windows), so results are
+    never reused across buckets even if the TTL would allow it. Concurrent
+    identical requests wait for one generation instead of starting their own.
+    """
+
+    def __init__(self, namespace: str, ttl: float = 3600, max_entries: int = 200, freshness: float = 3600,
+                 path: Optional[str] = None, enabled: bool = True):
+        self.cache = DiskCache(namespace, path=path, ttl=ttl, max_entries=max_entries, enabled=enabled)
+        self.freshness = freshness
+        self.flights = SingleFlight()
+
+    def key(self, parts: Sequence) -> str:
+        """Cache key for the request parameters in the current freshness bucket."""
+        normalized = [normalize_text(part) if isinstance(part, str) else part for part in parts]
+        return DiskCache.make_key(*normalized, int(time.time() // self.freshness))
+
+    def get(self, parts: Sequence) -> Optional[Dict]:
+        """Return a cached result for the parameters, or None."""
+        result = self.cache.get(self.key(parts))
+        record_cache(self.cache.namespace, result is not None)
+        if result is not None:
+            result.setdefault("metadata", {})["result_cache"] = "hit"
+        return result
+
+    def set(self, parts: Sequence, result: Dict) -> None:
+        """Store a finished result for the parameters."""
+        self.cache.set(self.key(parts), result)
+
+    def get_or_generate(self, parts: Sequence, generate: Callable[[], Dict],
+                        cacheable: Callable[[Dict], bool] = lambda result: True) -> Dict:
+        """
+        Return a cached result or generate one, coalescing concurrent identical requests.
+
+        Results for which cacheable() is False are returned but not stored.
+        Every caller receives its own copy, so callers may mutate the result.
+        """
+        cached = self.get(parts)
+        if cached is not None:
+            return cached
+
+        key = self.key(parts)
+
+        def produce() -> Dict:
+            result = generate()
+            if cacheable(result):
+                self.cache.set(key, result)
+            return result
+
+        result, shared = self.flights.do(key, produce)
+        result = copy.deepcopy(result)
+        result.setdefault("metadata", {})["result_cache"] = "shared" if shared else "miss"
+        return result
@@ -0,0 +1,250 @@
+import argparse
+import glob
+import hashlib
+import html
+import json
+import os
+import tarfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from utils.batch_generator import slugify
+from utils.content_processor import DOCUMENT_FIELDS, FRONTMATTER_FIELDS, ContentProcessor
+
+# Bump when the page layout changes so the next export rewrites every article
+EXPORT_VERSION = 1
+
+SITE_FORMATS = {
+    "frontmatter": "md",
+    "html": "html"
+}
+
+MANIFEST_FILE = "manifest.json"
+
+# Manifest entry fields used to build the index
+INDEX_FIELDS = ["title", "date", "tags"]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def content_type(content: Dict) -> str:
+    """
+    Content type recorded by ContentProcessor.add_metadata.
+
+    Trend reports from before the report recorded its type are recognized by their technology.
+    """
+    if "technology" in content and "content" not in content:
+        return "trend_report"
+    return content.get("metadata", {}).get("type") or content.get("type") or "blog_post"
+
+
+class SiteExporter:
+    """
+    Incrementally export articles to a static site directory.
+
+    Each article is written to posts/ as front-matter markdown and a standalone HTML
+    page as soon as it is added, so batches of any size are streamed to disk and
+    only a small manifest entry per article is kept in memory. Articles are named
+    by their content type, topic (or technology), style, length and date, so a
+    regenerated article replaces its page. The manifest (manifest.json) records a
+    hash of the fields each page is rendered from; re-exporting an unchanged
+    article skips rendering and writing it. finish() writes the manifest and, if
+    anything changed, index.md and index.html.
+    """
+
+    def __init__(self, content_processor, site_dir: str, formats: Optional[List[str]] = None,
+                 site_title: str = "Technical Blog"):
+        self.content_processor = content_processor
+        self.site_dir = site_dir
+        self.formats = list(formats or SITE_FORMATS)
+        for output_format in self.formats:
+            if output_format not in SITE_FORMATS:
+                raise ValueError(f"Unsupported format: {output_format}")
+        self.site_title = site_title
+        self.stats = {"written": 0, "unchanged": 0, "removed": 0}
+        self._lock = threading.Lock()
+        self._changed = False
+        self._seen = set()
+
+        os.makedirs(os.path.join(site_dir, "posts"), exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.site_dir, MANIFEST_FILE)
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self._manifest_path(), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest.get("articles", {}) if manifest.get("version") == EXPORT_VERSION else {}
+
+    @staticmethod
+    def content_hash(content: Dict) -> str:
+        """Hash of everything the exported pages are rendered from; the trace and other metadata are ignored."""
+        page = ContentProcessor.to_document(content)
+        fields = {field: page.get(field) for field in DOCUMENT_FIELDS}
+        fields["metadata"] = {field: page.get("metadata", {}).get(field) for field in FRONTMATTER_FIELDS}
+        return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def identity(content: Dict) -> List[str]:
+        """What makes two articles the same article: content type, topic or technology, style, length and date."""
+        subject = content.get("topic") or content.get("technology")
+        parts = [content_type(content), subject, content.get("style"), content.get("length"), content.get("date")]
+        return [str(part) for part in parts if part]
+
+    def _slug(self, identity: List[str]) -> str:
+        """Stable file name for an article, disambiguated by a hash when two identities slugify alike."""
+        slug = slugify(" ".join(identity))
+        key = "|".join(identity)
+        entry = self.manifest.get(slug)
+        if entry is not None and entry.get("identity") != key:
+            slug = f"{slug}_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
+        return slug
+
+    def _write(self, relative_path: str, text: str) -> None:
+        """Write a file atomically so readers of the site never see a partial page."""
+        path = os.path.join(self.site_dir, relative_path)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+    def add(self, content: Dict) -> str:
+        """Export one article unless it is unchanged; returns its slug."""
+        digest = self.content_hash(content)
+        identity = self.identity(content)
+        with self._lock:
+            slug = self._slug(identity)
+            self._seen.add(slug)
+            entry = self.manifest.get(slug)
+            files = {output_format: f"posts/{slug}.{SITE_FORMATS[output_format]}" for output_format in self.formats}
+            if (entry is not None and entry["hash"] == digest and entry["files"] == files
+                    and all(os.path.exists(os.path.join(self.site_dir, path)) for path in files.values())):
+                self.stats["unchanged"] += 1
+                return slug
+
+        page = ContentProcessor.to_document(content)
+        rendered = self.content_processor.render(content, self.formats)
+        for output_format, path in files.items():
+            text = rendered[output_format]
+            if output_format == "html":
+                text = PAGE_TEMPLATE.format(title=html.escape(page.get("title") or "Untitled"), body=text)
+            self._write(path, text)
+
+        with self._lock:
+            self.manifest[slug] = {
+                "hash": digest,
+                "identity": "|".join(identity),
+                "files": files,
+                "exported_at": time.time(),
+                "type": identity[0],
+                **{field: page.get(field) for field in INDEX_FIELDS}
+            }
+            self._changed = True
+            self.stats["written"] += 1
+        return slug
+
+    def export(self, contents: Iterable[Dict], prune: bool = False) -> Dict:
+        """Export every article from an iterable (consumed lazily), then write the index and manifest."""
+        for content in contents:
+            self.add(content)
+        return self.finish(prune=prune)
+
+    def finish(self, prune: bool = False) -> Dict:
+        """
+        Write the manifest and the index if anything changed; returns the export stats.
+
+        With prune, articles in the manifest that were not added in this export are
+        deleted from the site.
+        """
+        with self._lock:
+            if prune:
+                for slug in [slug for slug in self.manifest if slug not in self._seen]:
+                    for path in self.manifest.pop(slug)["files"].values():
+                        try:
+                            os.remove(os.path.join(self.site_dir, path))
+                        except FileNotFoundError:
+                            pass
+                    self.stats["removed"] += 1
+                    self._changed = True
+
+            indexes_missing = not all(
+                os.path.exists(os.path.join(self.site_dir, name)) for name in ("index.md", "index.html")
+            )
+            if self._changed or indexes_missing:
+                self._write_index()
+                self._write(MANIFEST_FILE, json.dumps(
+                    {"version": EXPORT_VERSION, "articles": self.manifest}, indent=2, default=str
+                ))
+                self._changed = False
+            return dict(self.stats, articles=len(self.manifest))
+
+    def _write_index(self) -> None:
+        """Write index.md and index.html listing every article, newest first."""
+        entries = sorted(self.manifest.items(), key=lambda item: str(item[1].get("date") or ""), reverse=True)
+        md = f"# {self.site_title}\n\n"
+        for slug, entry in entries:
+            link = entry["files"].get("html") or next(iter(entry["files"].values()))
+            md += f"- [{entry.get('title') or slug}]({link})"
+            if entry.get("date"):
+                md += f" ({str(entry['date'])[:10]})"
+            md += "\n"
+        self._write("index.md", md)
+        self._write("index.html", PAGE_TEMPLATE.format(
+            title=html.escape(self.site_title), body=self.content_processor.markdown_to_html(md)
+        ))
+
+    def write_archive(self, path: str) -> str:
+        """Pack the site directory into a .tar.gz archive, one file at a time."""
+        with tarfile.open(path, "w:gz") as archive:
+            archive.add(self.site_dir, arcname=os.path.basename(os.path.normpath(self.site_dir)) or "site")
+        return path
+
+
+def iter_content_files(paths: List[str]) -> Iterable[Dict]:
+    """Yield articles from JSON files (batch output or app downloads) one at a time."""
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            if os.path.basename(path) == "summary.json":
+                continue
+            with open(path, encoding="utf-8") as f:
+                yield json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point: python -m utils.site_exporter 'output/*.json' -o site/"""
+    parser = argparse.ArgumentParser(description="Export generated JSON articles to a static site.")
+    parser.add_argument("inputs", nargs="+", help="JSON article files or glob patterns")
+    parser.add_argument("-o", "--site-dir", default="site", help="Site directory")
+    parser.add_argument("-f", "--format", nargs="+", default=list(SITE_FORMATS), choices=list(SITE_FORMATS),
+                        help="Page formats to write")
+    parser.add_argument("--title", default="Technical Blog", help="Title of the index page")
+    parser.add_argument("--prune", action="store_true", help="Delete articles not in this export")
+    parser.add_argument("--archive", help="Also write the site to this .tar.gz file")
+    args = parser.parse_args(argv)
+
+    from utils.content_processor import ContentProcessor
+
+    exporter = SiteExporter(ContentProcessor(), args.site_dir, args.format, site_title=args.title)
+    stats = exporter.export(iter_content_files(args.inputs), prune=args.prune)
+    if args.archive:
+        stats["archive"] = exporter.write_archive(args.archive)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,331 @@
-import requests
-from typing import List, Dict
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, List, Dict, Optional
 from datetime import datetime, timedelta
-import json
+from utils.result_cache import ResultCache
+from utils.trend_index import TrendIndex
+
+if TYPE_CHECKING:
+    import requests
+    from github import Github
+
+# Base URLs for each upstream API, overridable for testing against local servers
+DEFAULT_ENDPOINTS = {
+    "github": "https://api.github.com",
+    "hacker_news": "https://hn.algolia.com/api/v1",
+    "dev_to": "https://dev.to/api",
+    "arxiv": "http://export.arxiv.org/api/query"
+}
+
+ATOM_NAMESPACE = {"atom": "http://www.w3.org/2005/Atom"}
+
+# Hacker News stories fetched per request
+HN_PAGE_SIZE = 100
 
 class TechTracker:
-    def __init__(self):
+    def __init__(self, session: Optional["requests.Session"] = None, github_token: Optional[str] = None,
+                 endpoints: Optional[Dict] = None, timeout: float = 10.0, source_timeout: float = 20.0,
+                 max_items: int = 10, github_client: Optional["Github"] = None,
+                 result_cache: Optional[ResultCache] = None, trend_index: Optional[TrendIndex] = None,
+                 trend_refresh_interval: Optional[float] = None, trend_rescore_window: Optional[float] = None):
         self.sources = [
             "github",
             "tech_blogs",
             "research_papers"
         ]
+        self.endpoints = dict(DEFAULT_ENDPOINTS)
+        self.endpoints.update(endpoints or {})
+        self.timeout = timeout
+        self.source_timeout = source_timeout
+        self.max_items = max_items
+
+        # One pooled session shared by every HTTP source; it and the GitHub client are built on first use
+        self._session = session
+        self._github = github_client
+        self.github_token = github_token or os.getenv("GITHUB_TOKEN")
+        self._client_lock = threading.Lock()
+
+        # Finished reports, shared by identical requests within a freshness window
+        self.result_cache = result_cache or ResultCache(
+            "trend_reports",
+            ttl=float(os.getenv("TREND_CACHE_TTL", 3600)),
+            max_entries=int(os.getenv("TREND_CACHE_MAX_ENTRIES", 200)),
+            freshness=float(os.getenv("TREND_CACHE_FRESHNESS", 3600)),
+            enabled=os.getenv("TREND_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        )
+
+        # Hacker News stories per technology, refreshed incrementally from a watermark
+        self.trend_index = trend_index or TrendIndex(retention_days=int(os.getenv("TREND_INDEX_RETENTION_DAYS", 90)))
+        if trend_refresh_interval is None:
+            trend_refresh_interval = float(os.getenv("TREND_REFRESH_INTERVAL", 300))
+        self.trend_refresh_interval = trend_refresh_interval
+        # Stories keep gaining points and comments for a while; refreshes fetch them again for this long
+        if trend_rescore_window is None:
+            trend_rescore_window = float(os.getenv("TREND_RESCORE_WINDOW", 2 * 86400))
+        self.trend_rescore_window = trend_rescore_window
+        self.trend_index.prune()
+
+    @property
+    def session(self) -> "requests.Session":
+        """HTTP session, created on first use."""
+        if self._session is None:
+            with self._client_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    @property
+    def github(self) -> "Github":
+        """PyGithub client, created on first use."""
+        if self._github is None:
+            with self._client_lock:
+                if self._github is None:
+                    self._github = self._create_github()
+        return self._github
+
+    def _create_session(self) -> "requests.Session":
+        """Create an HTTP session with connection pooling and retries on transient errors."""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+        adapter = HTTPAdapter(pool_connections=len(DEFAULT_ENDPOINTS), pool_maxsize=20, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["User-Agent"] = "Technical Blog Generator"
+        return session
+
+    def _create_github(self) -> "Github":
+        """Create a PyGithub client; retries and throttling are left to the caller's timeouts."""
+        from github import Auth, Github
+
+        return Github(
+            auth=Auth.Token(self.github_token) if self.github_token else None,
+            base_url=self.endpoints["github"],
+            timeout=int(self.timeout),
+            per_page=self.max_items,
+            retry=None,
+            seconds_between_requests=None
+        )
+
+    def _get(self, url: str, params: Dict) -> "requests.Response":
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response
 
     def get_recent_trends(self, technology: str, days: int = 30) -> List[Dict]:
         """
         Get recent trends and developments for a specific technology.
+
+        Hacker News stories are kept in the trend index. The first request for a
+        window fetches its most relevant stories. Later refreshes fetch the stories
+        newer than the watermark, plus those of the last trend_rescore_window seconds
+        so their points and comments stay current; there are no refreshes within
+        trend_refresh_interval.
+        """
+        start = (datetime.now() - timedelta(days=days)).timestamp()
+        state = self.trend_index.state(technology, "hacker_news")
+        if state is None or start < state["covered_from"]:
+            self._index_hacker_news(technology, "search", start, covered_from=start)
+        elif time.time() - state["refreshed_at"] >= self.trend_refresh_interval:
+            since = min(state["watermark"] or start, time.time() - self.trend_rescore_window)
+            self._index_hacker_news(
+                technology, "search_by_date", max(since, state["covered_from"]), covered_from=state["covered_from"]
+            )
+        return self.trend_index.items(technology, "hacker_news", start, order_by="points", limit=self.max_items)
+
+    def _fetch_hacker_news(self, technology: str, endpoint: str, since: float) -> List[Dict]:
         """
-        trends = []
-        start_date = datetime.now() - timedelta(days=days)
-        
-        # Placeholder for trend tracking logic
-        return trends
+        Fetch every story created since `since`, page by page until a page comes back short.
 
-    def analyze_github_trends(self, technology: str) -> List[Dict]:
+        Algolia stops paginating after 1000 hits; search_by_date (newest first) then
+        continues below the oldest story seen, while a relevance search stops there.
+        """
+        hits, page, until = [], 0, None
+        while True:
+            filters = f"created_at_i>={int(since)}" + (f",created_at_i<={until}" if until is not None else "")
+            body = self._get(f"{self.endpoints['hacker_news']}/{endpoint}", {
+                "query": technology,
+                "tags": "story",
+                "numericFilters": filters,
+                "hitsPerPage": HN_PAGE_SIZE,
+                "page": page
+            }).json()
+            page_hits = body.get("hits", [])
+            hits.extend(page_hits)
+            if len(page_hits) < HN_PAGE_SIZE:
+                return hits
+            page += 1
+            if page >= body.get("nbPages", page + 1):
+                if endpoint != "search_by_date":
+                    return hits
+                oldest = min(hit.get("created_at_i") or 0 for hit in page_hits)
+                if oldest == until:
+                    return hits
+                page, until = 0, oldest
+
+    def _index_hacker_news(self, technology: str, endpoint: str, since: float, covered_from: float) -> int:
+        """
+        Fetch stories created since `since` into the trend index; returns how many were new.
+
+        The index (and its watermark) is only updated once every page has been fetched.
+        """
+        items = []
+        for hit in self._fetch_hacker_news(technology, endpoint, since):
+            items.append({
+                "id": hit.get("objectID"),
+                "published_at": hit.get("created_at_i") or time.time(),
+                "points": hit.get("points") or 0,
+                "comments": hit.get("num_comments") or 0,
+                "payload": {
+                    "title": hit.get("title"),
+                    "url": hit.get("url") or f"https://news.ycombinator.com/item?id={hit.get('objectID')}",
+                    "points": hit.get("points", 0),
+                    "comments": hit.get("num_comments", 0),
+                    "published_at": hit.get("created_at"),
+                    "source": "hacker_news"
+                }
+            })
+        return self.trend_index.add_items(technology, "hacker_news", items, covered_from)
+
+    def get_trend_activity(self, technology: str, days: int = 30) -> List[Dict]:
+        """Daily Hacker News story, point and comment totals from the trend index."""
+        start = (datetime.now() - timedelta(days=days)).timestamp()
+        return self.trend_index.daily(technology, "hacker_news", start)
+
+    def analyze_github_trends(self, technology: str, days: int = 30) -> List[Dict]:
         """
         Analyze GitHub repositories and activities related to the technology.
         """
-        return []
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        repositories = self.github.search_repositories(
+            query=f"{technology} pushed:>{since}", sort="stars", order="desc"
+        )
+
+        activity = []
+        for repo in repositories[:self.max_items]:
+            activity.append({
+                "name": repo.full_name,
+                "url": repo.html_url,
+                "description": repo.description,
+                "stars": repo.stargazers_count,
+                "forks": repo.forks_count,
+                "language": repo.language,
+                "updated_at": repo.pushed_at.isoformat() if repo.pushed_at else None
+            })
+        return activity
 
-    def fetch_tech_blogs(self, technology: str) -> List[Dict]:
+    def fetch_tech_blogs(self, technology: str, days: int = 30) -> List[Dict]:
         """
         Fetch relevant technical blog posts about the technology.
         """
-        return []
+        # dev.to tags are single lowercase words
+        tag = re.sub(r"[^a-z0-9]", "", technology.lower())
+        response = self._get(f"{self.endpoints['dev_to']}/articles", {
+            "tag": tag,
+            "top": days,
+            "per_page": self.max_items
+        })
+
+        posts = []
+        for article in response.json():
+            posts.append({
+                "title": article.get("title"),
+                "url": article.get("url"),
+                "author": (article.get("user") or {}).get("name"),
+                "published_at": article.get("published_at"),
+                "reactions": article.get("public_reactions_count", 0),
+                "source": "dev.to"
+            })
+        return posts
 
     def get_research_papers(self, technology: str) -> List[Dict]:
         """
         Find recent research papers and academic publications.
         """
-        return []
+        response = self._get(self.endpoints["arxiv"], {
+            "search_query": f'all:"{technology}"',
+            "sortBy": "submittedDate",
+            "sortOrder": "descending",
+            "max_results": self.max_items
+        })
+
+        papers = []
+        for entry in ET.fromstring(response.content).findall("atom:entry", ATOM_NAMESPACE):
+            papers.append({
+                "title": " ".join((entry.findtext("atom:title", "", ATOM_NAMESPACE)).split()),
+                "url": entry.findtext("atom:id", "", ATOM_NAMESPACE),
+                "authors": [
+                    author.findtext("atom:name", "", ATOM_NAMESPACE)
+                    for author in entry.findall("atom:author", ATOM_NAMESPACE)
+                ],
+                "published_at": entry.findtext("atom:published", "", ATOM_NAMESPACE),
+                "summary": " ".join((entry.findtext("atom:summary", "", ATOM_NAMESPACE)).split())[:300]
+            })
+        return papers
 
     def generate_trend_report(self, technology: str) -> Dict:
         """
         Generate a comprehensive trend report.
+
+        Complete reports are cached per technology, and concurrent identical requests
+        share one report; partial reports are returned but not cached.
+        """
+        return self.result_cache.get_or_generate(
+            ("trend_report", technology),
+            lambda: self._generate_trend_report(technology),
+            cacheable=lambda report: not report["partial"]
+        )
+
+    def _generate_trend_report(self, technology: str) -> Dict:
+        """
+        Fetch every source and assemble the report.
+
+        Sources are fetched concurrently. A source that fails or does not finish within
+        source_timeout is reported in "sources" and its section is left empty, so one
+        slow source cannot stall the report.
         """
-        return {
+        fetchers = {
+            "trends": self.get_recent_trends,
+            "github_activity": self.analyze_github_trends,
+            "blog_posts": self.fetch_tech_blogs,
+            "research": self.get_research_papers
+        }
+
+        def timed(fetch):
+            start = time.perf_counter()
+            return fetch(technology), time.perf_counter() - start
+
+        executor = ThreadPoolExecutor(max_workers=len(fetchers), thread_name_prefix="trend")
+        try:
+            futures = {name: executor.submit(timed, fetch) for name, fetch in fetchers.items()}
+            wait(list(futures.values()), timeout=self.source_timeout)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        report = {
+            "type": "trend_report",
             "technology": technology,
             "date": datetime.now().strftime("%Y-%m-%d"),
-            "trends": self.get_recent_trends(technology),
-            "github_activity": self.analyze_github_trends(technology),
-            "blog_posts": self.fetch_tech_blogs(technology),
-            "research": self.get_research_papers(technology)
-        } 
\ No newline at end of file
+            "sources": {}
+        }
+        for name, future in futures.items():
+            if not future.done():
+                report[name] = []
+                report["sources"][name] = {"status": "timeout", "items": 0}
+            elif future.exception() is not None:
+                report[name] = []
+                report["sources"][name] = {"status": "error", "items": 0, "error": str(future.exception())}
+            else:
+                items, seconds = future.result()
+                report[name] = items
+                report["sources"][name] = {"status": "ok", "items": len(items), "seconds": round(seconds, 3)}
+        report["activity"] = self.get_trend_activity(technology)
+        report["partial"] = any(source["status"] != "ok" for source in report["sources"].values())
+        return report
@@ -0,0 +1,26 @@
+from typing import Dict
+
+# Rough characters-per-token ratio for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+# Per-message overhead of the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Completion budget assumed when a request does not set max_tokens
+DEFAULT_COMPLETION_TOKENS = 256
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def estimate_request_tokens(request: Dict) -> int:
+    """Estimate prompt plus completion tokens for a chat completion request."""
+    prompt_tokens = sum(
+        estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+        for message in request.get("messages", [])
+    )
+    return prompt_tokens + request.get("max_tokens", DEFAULT_COMPLETION_TOKENS)
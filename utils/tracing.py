@@ -0,0 +1,168 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class MetricsRegistry:
+    """Process-wide aggregates of stage timings, token usage and cache lookups."""
+
+    def __init__(self, prefix: str = "devwords"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.stage_seconds = {}
+        self.stage_count = {}
+        self.tokens = {}
+        self.cache_lookups = {}
+
+    def observe_span(self, record: Dict) -> None:
+        with self._lock:
+            stage = record["stage"]
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + record["seconds"]
+            self.stage_count[stage] = self.stage_count.get(stage, 0) + 1
+            for kind in ("prompt", "completion"):
+                if record.get(f"{kind}_tokens"):
+                    key = (stage, record.get("model", ""), kind)
+                    self.tokens[key] = self.tokens.get(key, 0) + record[f"{kind}_tokens"]
+
+    def observe_cache(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            key = (cache, "hit" if hit else "miss")
+            self.cache_lookups[key] = self.cache_lookups.get(key, 0) + 1
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        p = self.prefix
+        with self._lock:
+            lines = [
+                f"# HELP {p}_stage_seconds Wall time spent in each generation stage.",
+                f"# TYPE {p}_stage_seconds summary"
+            ]
+            for stage in sorted(self.stage_seconds):
+                lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {self.stage_seconds[stage]:.6f}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {self.stage_count[stage]}')
+
+            lines += [
+                f"# HELP {p}_tokens_total Tokens reported by completion usage.",
+                f"# TYPE {p}_tokens_total counter"
+            ]
+            for (stage, model, kind), value in sorted(self.tokens.items()):
+                lines.append(f'{p}_tokens_total{{stage="{stage}",model="{model}",kind="{kind}"}} {value}')
+
+            lines += [
+                f"# HELP {p}_cache_lookups_total Cache lookups by result.",
+                f"# TYPE {p}_cache_lookups_total counter"
+            ]
+            for (cache, result), value in sorted(self.cache_lookups.items()):
+                lines.append(f'{p}_cache_lookups_total{{cache="{cache}",result="{result}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the metrics to a file, e.g. for the node_exporter textfile collector."""
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(path + ".tmp", path)
+
+
+METRICS = MetricsRegistry()
+
+
+class Trace:
+    """Per-request record of stage spans and cache lookups."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans = []
+        self.cache = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, record: Dict) -> None:
+        with self._lock:
+            self.spans.append(record)
+
+    def add_cache(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            stats = self.cache.setdefault(cache, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += 1
+
+    def to_dict(self) -> Dict:
+        """Serializable summary for the content dict's metadata."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda record: record["start"])
+            return {
+                "name": self.name,
+                "total_seconds": round(time.perf_counter() - self.started, 4),
+                "prompt_tokens": sum(record.get("prompt_tokens", 0) for record in spans),
+                "completion_tokens": sum(record.get("completion_tokens", 0) for record in spans),
+                "spans": spans,
+                "cache": {name: dict(stats) for name, stats in self.cache.items()}
+            }
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace active in this context, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str) -> Iterator[Trace]:
+    """Make a new trace current for the duration of the block."""
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            # Generators closed from another context cannot reset their token
+            _current_trace.set(None)
+
+
+@contextmanager
+def span(stage: str, **attributes) -> Iterator[Dict]:
+    """
+    Time a pipeline stage.
+
+    Yields the span record so callers can attach token counts or other attributes.
+    The record is added to the current trace (if any) and the global metrics.
+    """
+    trace = current_trace()
+    record = {"stage": stage}
+    record.update(attributes)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 4)
+        record["start"] = round(start - trace.started, 4) if trace is not None else 0.0
+        METRICS.observe_span(record)
+        if trace is not None:
+            trace.add_span(record)
+
+
+def record_usage(record: Dict, completion) -> None:
+    """Copy prompt and completion token counts from a completion's usage onto a span record."""
+    usage = getattr(completion, "usage", None)
+    if usage is not None:
+        record["prompt_tokens"] = usage.prompt_tokens
+        record["completion_tokens"] = usage.completion_tokens
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup on the current trace and the global metrics."""
+    METRICS.observe_cache(cache, hit)
+    trace = current_trace()
+    if trace is not None:
+        trace.add_cache(cache, hit)
+
+
+def submit_in_context(executor, fn, *args, **kwargs):
+    """Submit fn to an executor so it runs with the caller's trace context."""
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
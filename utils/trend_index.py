@@ -0,0 +1,183 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from utils.cache import DEFAULT_CACHE_PATH, normalize_text
+
+# Columns items() can order by
+ITEM_ORDERS = ("published_at", "points", "comments")
+
+
+class TrendIndex:
+    """
+    Local time series of trend items per technology and source.
+
+    Each (technology, source) pair has a watermark, the newest publication time
+    seen, and the start of the window it covers, so refreshes only need to fetch
+    newer items. Daily item, point and comment totals are updated as items are
+    inserted or rescored instead of being recomputed from the items.
+    """
+
+    def __init__(self, path: Optional[str] = None, retention_days: int = 90):
+        self.path = path or os.getenv("CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS trend_items (
+                technology TEXT NOT NULL,
+                source TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                published_at REAL NOT NULL,
+                payload TEXT NOT NULL,
+                points INTEGER NOT NULL DEFAULT 0,
+                comments INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (technology, source, item_id)
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS trend_items_time ON trend_items (technology, source, published_at)")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS trend_watermarks (
+                technology TEXT NOT NULL,
+                source TEXT NOT NULL,
+                watermark REAL,
+                covered_from REAL NOT NULL,
+                refreshed_at REAL NOT NULL,
+                PRIMARY KEY (technology, source)
+            )"""
+        )
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS trend_daily (
+                technology TEXT NOT NULL,
+                source TEXT NOT NULL,
+                day TEXT NOT NULL,
+                items INTEGER NOT NULL,
+                points INTEGER NOT NULL,
+                comments INTEGER NOT NULL,
+                PRIMARY KEY (technology, source, day)
+            )"""
+        )
+        conn.commit()
+        return conn
+
+    def state(self, technology: str, source: str) -> Optional[Dict]:
+        """Return the watermark, covered window start and last refresh time, or None if never fetched."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark, covered_from, refreshed_at FROM trend_watermarks WHERE technology = ? AND source = ?",
+                (normalize_text(technology), source)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"watermark": row[0], "covered_from": row[1], "refreshed_at": row[2]}
+
+    def add_items(self, technology: str, source: str, items: List[Dict], covered_from: float) -> int:
+        """
+        Record a refresh: insert new items, rescore known ones and advance the watermark.
+
+        Items need "id", "published_at" (epoch seconds) and "payload"; optional
+        "points" and "comments" feed the daily totals. An item already stored is
+        rescored: its payload, points and comments are replaced and the daily totals
+        change by the difference, so overlapping refreshes do not double count.
+        Returns the number of new items.
+        """
+        technology = normalize_text(technology)
+        now = time.time()
+        added = 0
+        with self._lock:
+            for item in items:
+                key = (technology, source, str(item["id"]))
+                points, comments = item.get("points") or 0, item.get("comments") or 0
+                day = datetime.fromtimestamp(item["published_at"], tz=timezone.utc).strftime("%Y-%m-%d")
+                stored = self._conn.execute(
+                    "SELECT points, comments FROM trend_items WHERE technology = ? AND source = ? AND item_id = ?", key
+                ).fetchone()
+                if stored is None:
+                    added += 1
+                    self._conn.execute(
+                        """INSERT INTO trend_items (technology, source, item_id, published_at, payload, points, comments)
+                           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                        (*key, item["published_at"], json.dumps(item["payload"]), points, comments)
+                    )
+                    new_items, points_delta, comments_delta = 1, points, comments
+                else:
+                    self._conn.execute(
+                        """UPDATE trend_items SET payload = ?, points = ?, comments = ?
+                           WHERE technology = ? AND source = ? AND item_id = ?""",
+                        (json.dumps(item["payload"]), points, comments, *key)
+                    )
+                    new_items, points_delta, comments_delta = 0, points - stored[0], comments - stored[1]
+                    if not points_delta and not comments_delta:
+                        continue
+                self._conn.execute(
+                    """INSERT INTO trend_daily (technology, source, day, items, points, comments)
+                       VALUES (?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (technology, source, day) DO UPDATE SET
+                           items = items + excluded.items,
+                           points = points + excluded.points,
+                           comments = comments + excluded.comments""",
+                    (technology, source, day, new_items, points_delta, comments_delta)
+                )
+
+            newest = max((item["published_at"] for item in items), default=None)
+            self._conn.execute(
+                """INSERT INTO trend_watermarks (technology, source, watermark, covered_from, refreshed_at)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (technology, source) DO UPDATE SET
+                       watermark = MAX(COALESCE(watermark, excluded.watermark), COALESCE(excluded.watermark, watermark)),
+                       covered_from = MIN(covered_from, excluded.covered_from),
+                       refreshed_at = excluded.refreshed_at""",
+                (technology, source, newest, covered_from, now)
+            )
+            self._conn.commit()
+        return added
+
+    def items(self, technology: str, source: str, since: float, order_by: str = "published_at",
+              limit: Optional[int] = None) -> List[Dict]:
+        """Return stored item payloads published after `since`, highest `order_by` first (newest on ties)."""
+        if order_by not in ITEM_ORDERS:
+            raise ValueError(f"Unsupported order: {order_by}")
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT payload FROM trend_items
+                    WHERE technology = ? AND source = ? AND published_at >= ?
+                    ORDER BY {order_by} DESC, published_at DESC LIMIT ?""",
+                (normalize_text(technology), source, since, -1 if limit is None else limit)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def daily(self, technology: str, source: str, since: float) -> List[Dict]:
+        """Return the daily totals from `since` onwards, oldest first."""
+        since_day = datetime.fromtimestamp(since, tz=timezone.utc).strftime("%Y-%m-%d")
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT day, items, points, comments FROM trend_daily
+                   WHERE technology = ? AND source = ? AND day >= ? ORDER BY day""",
+                (normalize_text(technology), source, since_day)
+            ).fetchall()
+        return [{"day": row[0], "items": row[1], "points": row[2], "comments": row[3]} for row in rows]
+
+    def prune(self) -> int:
+        """Delete items and daily totals older than the retention period; returns the number of items removed."""
+        cutoff = time.time() - self.retention_days * 86400
+        cutoff_day = datetime.fromtimestamp(cutoff, tz=timezone.utc).strftime("%Y-%m-%d")
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM trend_items WHERE published_at < ?", (cutoff,))
+            self._conn.execute("DELETE FROM trend_daily WHERE day < ?", (cutoff_day,))
+            self._conn.execute(
+                "UPDATE trend_watermarks SET covered_from = ? WHERE covered_from < ?", (cutoff, cutoff)
+            )
+            self._conn.commit()
+        return cursor.rowcount